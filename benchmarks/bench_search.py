@@ -0,0 +1,192 @@
+# Times each run_search stage on generated libraries of 1k, 10k and 100k
+# tiles. Run with python3.11 and OIIO available:
+#   python3.11 benchmarks/bench_search.py [--scales 1000 10000] [--save-baseline]
+# Exits 1 if any stage is slower or uses more memory per tile than the
+# stored baseline.
+
+import os
+import sys
+import copy
+import json
+import time
+import shutil
+import resource
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import run_search
+from generate_tree import generate_tree, load_manifest
+
+SCALES = [1000, 10000, 100000]
+TILES_PER_SET = 10
+TREE_DIR = os.path.join(tempfile.gettempdir(), "import_textures_bench")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# A stage is a regression when slower than baseline by more than
+# TOLERANCE, stages quicker than MIN_SECONDS are too noisy to judge.
+TOLERANCE = 0.2
+MIN_SECONDS = 0.05
+
+# Memory is the growth in peak RSS over the process at the start of the
+# stages, per 10k tiles. Below MIN_RSS_MB it's allocator noise.
+MIN_RSS_MB = 8
+
+
+def peak_rss_mb() -> float:
+    """High water RSS of this process, ru_maxrss is KB on Linux."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def ensure_tree(files: int, tree_dir: str=TREE_DIR) -> str:
+    """Library with files tiles, reused between runs."""
+    root = os.path.join(tree_dir, str(files))
+    sets = max(files // TILES_PER_SET, 1)
+    manifest = load_manifest(root)
+    if not manifest or (manifest["sets"], manifest["tiles"]) != (sets, TILES_PER_SET):
+        shutil.rmtree(root, ignore_errors=True)
+        os.makedirs(root)
+        print(f"Generating {files} tiles in {root}", file=sys.stderr)
+        generate_tree(root, sets, TILES_PER_SET)
+    return root
+
+
+def fresh(tiles: list) -> list:
+    """Unprobed copies, stages fill metadata into tiles in place."""
+    tiles = [copy.copy(t) for t in tiles]
+    for tile in tiles:
+        tile.res = tile.bitdepth = tile.channels = tile.complete = None
+    return tiles
+
+
+def run_stages(root: str) -> dict:
+    """Time each pipeline stage on root, returns {stage:
+    {seconds, files, files_per_s, peak_rss_mb, rss_per_10k_mb}}."""
+    results = {}
+    start_rss = peak_rss_mb()
+
+    def timed(stage, files, func, *args, **kwargs):
+        """files None counts the returned list."""
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        seconds = time.perf_counter() - start
+        if files is None:
+            files = len(value)
+        peak = peak_rss_mb()
+        results[stage] = {"seconds": round(seconds, 4), "files": files,
+                          "files_per_s": round(files / seconds) if seconds else None,
+                          "peak_rss_mb": round(peak, 1),
+                          "rss_per_10k_mb": round((peak - start_rss) * 10000 / files, 2)}
+        return value
+
+    with tempfile.TemporaryDirectory() as cache_dir, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        target_files = timed("find_target_files", None, run_search.find_target_files, root)
+        files = len(target_files)
+
+        timed("organise_image_data", files, run_search.organise_image_data, target_files)
+
+        cache = run_search.open_cache(os.path.join(cache_dir, "cache.sqlite"))
+        timed("get_metadata_cold", files, run_search.get_metadata, fresh(target_files),
+              cache=cache)
+        cache.commit()
+        timed("get_metadata_warm", files, run_search.get_metadata, fresh(target_files),
+              cache=cache)
+
+        organised = run_search.organise_image_data(fresh(target_files))
+        timed("stream_texture_sets", files, run_search.stream_texture_sets,
+              organised, cache=cache)
+        timed("verify_texture_sets", files, run_search.verify_texture_sets,
+              organised, cache=cache)
+        cache.close()
+    return results
+
+
+def run_scale(files: int, tree_dir: str) -> dict:
+    """Run one scale in a fresh process so peak RSS is its own."""
+    root = ensure_tree(files, tree_dir)
+    output = subprocess.run([sys.executable, __file__, "--stages", root],
+                            check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+
+def compare(results: dict, baseline: dict) -> list:
+    """Returns a line per stage slower or using more memory
+    than baseline."""
+    regressions = []
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            base = baseline.get(scale, {}).get(stage)
+            if not base:
+                continue
+            if max(base["seconds"], result["seconds"]) >= MIN_SECONDS:
+                ratio = result["seconds"] / base["seconds"]
+                if ratio > 1 + TOLERANCE:
+                    regressions.append(f"{scale} {stage}: {result['seconds']:.3f}s "
+                                       f"vs {base['seconds']:.3f}s ({ratio:.2f}x)")
+            memory, base_memory = result["rss_per_10k_mb"], base.get("rss_per_10k_mb")
+            if (base_memory is not None and memory >= MIN_RSS_MB
+                    and memory > max(base_memory, 0) * (1 + TOLERANCE)):
+                regressions.append(f"{scale} {stage}: {memory:.1f} MB per 10k tiles "
+                                   f"vs {base_memory:.1f} MB")
+    return regressions
+
+
+def print_report(results: dict, baseline: dict):
+    print(f"{'files':>8} {'stage':<22} {'seconds':>9} {'files/s':>10} "
+          f"{'rss MB':>8} {'MB/10k':>8} {'baseline':>9} {'MB/10k':>8}")
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            base = baseline.get(scale, {}).get(stage) or {}
+            base_seconds = f"{base['seconds']:.3f}" if base else "-"
+            base_memory = base.get("rss_per_10k_mb", "-")
+            print(f"{scale:>8} {stage:<22} {result['seconds']:>9.3f} "
+                  f"{result['files_per_s'] or 0:>10} {result['peak_rss_mb']:>8} "
+                  f"{result['rss_per_10k_mb']:>8} {base_seconds:>9} {base_memory:>8}")
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description="Benchmark the run_search pipeline.")
+    parser.add_argument("--scales", type=int, nargs="+", default=SCALES,
+                        help="Tile counts to benchmark.")
+    parser.add_argument("--tree-dir", default=TREE_DIR,
+                        help="Where generated libraries are kept between runs.")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store these results as the new baseline.")
+    parser.add_argument("--stages", metavar="ROOT", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list) -> int:
+    args = parse_args(argv)
+    if args.stages:
+        print(json.dumps(run_stages(args.stages)))
+        return 0
+
+    results = {str(files): run_scale(files, args.tree_dir) for files in args.scales}
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline)
+    for line in regressions:
+        print(f"[Regression] {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
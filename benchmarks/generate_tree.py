@@ -0,0 +1,113 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+
+import OpenImageIO as OpenIO
+
+# Tiny but valid tiles, one template per file type is written with OIIO
+# then copied, so large trees are quick to build.
+TILE_RES = 16
+TILE_FORMATS = {"exr": (3, OpenIO.HALF),
+                "tif": (1, OpenIO.UINT16),
+                "jpg": (3, OpenIO.UINT8)}
+CHANNEL_NAMES = ["diffuse", "roughness", "normal", "height", "metalness", "specular"]
+NOISE_FILES = ["notes.json", "preview.png", "{name}_v2.tif", "{name}.psd", ".DS_Store"]
+MANIFEST = "bench_tree.json"
+
+
+def write_templates(template_dir: str) -> dict:
+    """Write one tile per file type, returns {ext: path}."""
+    os.makedirs(template_dir, exist_ok=True)
+    templates = {}
+    for ext, (channels, fmt) in TILE_FORMATS.items():
+        path = os.path.join(template_dir, f"template.{ext}")
+        buf = OpenIO.ImageBuf(OpenIO.ImageSpec(TILE_RES, TILE_RES, channels, fmt))
+        OpenIO.ImageBufAlgo.fill(buf, [0.5] * channels)
+        if not buf.write(path):
+            raise RuntimeError(f"Failed to write {path}: {buf.geterror()}")
+        templates[ext] = path
+    return templates
+
+
+def set_folder(root: str, index: int, depth: int) -> str:
+    """Spread sets over depth levels of asset folders."""
+    parts = [f"asset_{index % 50:02d}"]
+    for level in range(1, depth):
+        parts.append(f"level{level}_{(index // (50 * level)) % 4}")
+    return os.path.join(root, *parts)
+
+
+def generate_tree(root: str, sets: int, tiles: int, depth: int=3,
+                  noise: float=0.1, formats: list=None) -> dict:
+    """Build a texture library below root with sets of udim
+    tiles, plus noise files (roughly noise per tile) which
+    run_search should skip. Returns the tree manifest."""
+    formats = formats or list(TILE_FORMATS)
+    with tempfile.TemporaryDirectory() as template_dir:
+        templates = write_templates(template_dir)
+        tile_count, noise_count = write_sets(root, templates, sets, tiles,
+                                             depth, noise, formats)
+
+    manifest = {"sets": sets, "tiles": tiles, "depth": depth, "noise": noise,
+                "formats": formats, "tile_files": tile_count, "noise_files": noise_count}
+    with open(os.path.join(root, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_sets(root: str, templates: dict, sets: int, tiles: int, depth: int,
+               noise: float, formats: list) -> tuple:
+    """Copy templates into place, returns (tiles, noise files)."""
+    tile_count = 0
+    noise_count = 0
+    for index in range(sets):
+        folder = set_folder(root, index, depth)
+        os.makedirs(folder, exist_ok=True)
+        ext = formats[index % len(formats)]
+        name = f"{CHANNEL_NAMES[index % len(CHANNEL_NAMES)]}_{index:06d}"
+        sep = "." if index % 2 else "_"
+        for tile in range(tiles):
+            shutil.copyfile(templates[ext],
+                            os.path.join(folder, f"{name}{sep}{1001 + tile}.{ext}"))
+            tile_count += 1
+
+        wanted = int((index + 1) * tiles * noise) - int(index * tiles * noise)
+        for n in range(wanted):
+            noise_name = NOISE_FILES[(index + n) % len(NOISE_FILES)].format(name=name)
+            with open(os.path.join(folder, f"{n}_{noise_name}"), "wb") as f:
+                f.write(b"\0" * 64)
+            noise_count += 1
+    return tile_count, noise_count
+
+
+def load_manifest(root: str) -> dict:
+    try:
+        with open(os.path.join(root, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description="Generate a synthetic udim texture library.")
+    parser.add_argument("root", help="Folder to create the library in.")
+    parser.add_argument("--sets", type=int, default=100)
+    parser.add_argument("--tiles", type=int, default=10, help="Udim tiles per set.")
+    parser.add_argument("--depth", type=int, default=3, help="Folder levels below root.")
+    parser.add_argument("--noise", type=float, default=0.1,
+                        help="Non texture files per tile.")
+    parser.add_argument("--formats", nargs="+", choices=sorted(TILE_FORMATS),
+                        default=list(TILE_FORMATS))
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    if os.path.exists(args.root) and os.listdir(args.root):
+        sys.exit(f"{args.root} is not empty")
+    manifest = generate_tree(args.root, args.sets, args.tiles, args.depth,
+                             args.noise, args.formats)
+    print(json.dumps(manifest, indent=2))
@@ -0,0 +1,237 @@
+# Headless scan to import plan, no Qt or Mari. Gives the nodes the tool
+# would create for a folder with their size, depth, colourspace, image
+# template and graph position, so deliveries can be checked on the farm
+# or in CI before anyone opens Mari:
+#   python3.11 import_core.py /path/to/delivery [--json] [--strict]
+# run_search (and OIIO) is only imported when a scan is run.
+import sys
+import json
+import fnmatch
+import argparse
+
+from scan_store import ScanResultStore, record_key
+from import_plan import plan_import
+from import_cost import (DEFAULT_THROUGHPUT, parse_size, paint_bytes, import_seconds,
+                         format_bytes)
+
+# Table choices, the first option is used when a probed value isn't one.
+DEPTH_OPTIONS = ["8-bit", "16-bit", "32-bit"]
+COLOURSPACE_OPTIONS = ["color", "scalar"]
+COMBO_OPTIONS = {"Depth": DEPTH_OPTIONS, "Colourspace": COLOURSPACE_OPTIONS}
+
+# Node sizes on the graph. Mari's own are measured at import, these
+# stand in when planning without it.
+PAINT_NODE_SIZE = (160, 50)
+BROADCASTER_NODE_SIZE = (160, 30)
+
+
+class PlannedNode:
+    """Paint node, and broadcaster if any, for one texture set."""
+    __slots__ = ("key", "name", "ext", "root", "width", "height", "depth", "colourspace",
+                 "template", "files", "broadcaster", "layout", "memory", "seconds")
+
+    def __init__(self, row: dict, layout, throughput: float=DEFAULT_THROUGHPUT):
+        self.key = row["key"]
+        self.name = row["Name"]
+        self.ext = row["File Type"]
+        self.root = row["Root"]
+        self.width, self.height = paint_node_size(row["Size"])
+        self.depth = int(row["Depth"].split("-")[0])
+        self.colourspace = row["Colourspace"]
+        self.template = row["template"]
+        self.files = row["files"]
+        self.broadcaster = row["Broadcaster"]
+        self.layout = layout
+        self.memory = paint_bytes(row["Size"], row["Depth"], len(self.files))
+        self.seconds = import_seconds(self.memory, throughput)
+
+
+    def to_dict(self) -> dict:
+        paint = self.layout.paint
+        broadcaster = self.layout.broadcaster
+        return {
+            "name": self.name,
+            "ext": self.ext,
+            "root": self.root,
+            "size": [self.width, self.height],
+            "depth": self.depth,
+            "colourspace": self.colourspace,
+            "template": self.template,
+            "udims": len(self.files),
+            "memory": self.memory,
+            "seconds": round(self.seconds, 2),
+            "position": [paint.x, paint.y],
+            "broadcaster": [broadcaster.x, broadcaster.y] if broadcaster else None,
+            }
+
+
+def paint_node_size(size: str) -> tuple:
+    """(width, height) createPaintNode is called with."""
+    x, y = size.split("x")
+    return int(x), int(y)
+
+
+def table_row(summary: dict) -> dict:
+    """Table row for a TextureSet summary, combo values the
+    table can't show replaced by their first option."""
+    row = dict(summary)
+    for header, options in COMBO_OPTIONS.items():
+        if row.get(header) not in options:
+            row[header] = options[0]
+    row["Selected"] = False
+    row["Broadcaster"] = False
+    return row
+
+
+def import_rows(store: ScanResultStore, rows: list) -> list:
+    """Selected table rows with their set's files and template
+    added, ready for PaintNode or plan_rows. Rows carry the
+    set_key of their set in 'key'."""
+    for row in rows:
+        texture_set = store.get(row["key"])
+        row["files"] = texture_set.paths
+        row["template"] = texture_set.template
+    return rows
+
+
+def plan_rows(rows: list, throughput: float=DEFAULT_THROUGHPUT):
+    """Lay out rows at the standard node sizes. Returns
+    (PlannedNodes, backdrop layouts)."""
+    plan = plan_import([
+        {"broadcaster": row["Broadcaster"],
+         "paint_size": PAINT_NODE_SIZE,
+         "broadcaster_size": BROADCASTER_NODE_SIZE if row["Broadcaster"] else None}
+        for row in rows])
+    nodes = [PlannedNode(row, layout, throughput) for row, layout in zip(rows, plan.sets)]
+    return nodes, plan.backdrops
+
+
+def scan(paths, full_probe: bool=False, **options) -> tuple:
+    """Scan paths with run_search. Returns (ScanResultStore,
+    verify issues by set_key, warnings). options are
+    max_files, time_budget and find_duplicates."""
+    import run_search
+
+    store = ScanResultStore()
+    issues = {}
+    warnings = []
+    for record in run_search.iter_scan(paths, full_probe, **options):
+        record_type = record.get("type")
+        if record_type == "set":
+            store.add_record(record)
+        elif record_type == "verify":
+            issues.setdefault(record_key(record), []).append(
+                f"{record['udim']} {record['issue']}")
+        elif record_type == "duplicates":
+            templates = [template for _, _, _, template in record["sets"]]
+            warnings.append(f"[Duplicates] {' = '.join(templates)}")
+        elif record_type == "log" and record["flag"] not in ("DEBUG", "INFO", "ValidPath",
+                                                             "FileCount"):
+            warnings.append(f"[{record['flag']}] {record['msg']}")
+    return store, issues, warnings
+
+
+def unknown_values(summary: dict, depth: str=None) -> list:
+    """Values a set's first tile didn't give, usually as it
+    couldn't be read. Such sets can't be planned."""
+    unknown = []
+    if not parse_size(summary["Size"]):
+        unknown.append("size")
+    if not depth and summary["Depth"] not in DEPTH_OPTIONS:
+        unknown.append("depth")
+    return unknown
+
+
+def select_rows(store: ScanResultStore, patterns: list=None, broadcaster: bool=False,
+                depth: str=None, colourspace: str=None) -> tuple:
+    """Table rows for sets whose name matches any pattern, all
+    sets without patterns, with the table choices applied.
+    Returns (rows, skipped [(name, ext, root, unknown values)])."""
+    rows = []
+    skipped = []
+    for texture_set in store.sorted_sets():
+        summary = texture_set.summary
+        if patterns and not any(fnmatch.fnmatch(summary["Name"], p) for p in patterns):
+            continue
+        unknown = unknown_values(summary, depth)
+        if unknown:
+            skipped.append((summary["Name"], summary["File Type"], summary["Root"], unknown))
+            continue
+        row = table_row(summary)
+        row["key"] = texture_set.key
+        row["Selected"] = True
+        row["Broadcaster"] = broadcaster
+        if depth:
+            row["Depth"] = depth
+        if colourspace:
+            row["Colourspace"] = colourspace
+        rows.append(row)
+    return import_rows(store, rows), skipped
+
+
+def print_plan(nodes: list, issues: dict, warnings: list):
+    for line in warnings:
+        print(line)
+    print(f"{'name':<32} {'type':<5} {'size':>11} {'depth':>5} {'space':<7} "
+          f"{'udims':>5} {'memory':>10} {'position':>14}  root")
+    for node in nodes:
+        size = f"{node.width}x{node.height}"
+        position = f"{node.layout.paint.x:.0f},{node.layout.paint.y:.0f}"
+        print(f"{node.name:<32} {node.ext:<5} {size:>11} {node.depth:>5} "
+              f"{node.colourspace:<7} {len(node.files):>5} "
+              f"{format_bytes(node.memory):>10} {position:>14}  {node.root}")
+        for issue in issues.get(node.key, []):
+            print(f"    [TileIssue] {issue}")
+    print(f"{len(nodes)} nodes, {format_bytes(sum(n.memory for n in nodes))}")
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description="Scan folders and print the import plan.")
+    parser.add_argument("paths", nargs="+", metavar="path")
+    parser.add_argument("--select", nargs="+", metavar="PATTERN",
+                        help="Only plan sets whose name matches, e.g. 'diffuse*'.")
+    parser.add_argument("--broadcaster", action="store_true",
+                        help="Plan a broadcaster for every set.")
+    parser.add_argument("--depth", choices=DEPTH_OPTIONS, help="Override the probed depth.")
+    parser.add_argument("--colourspace", choices=COLOURSPACE_OPTIONS)
+    parser.add_argument("--full", action="store_true", help="Probe every tile header.")
+    parser.add_argument("--max-files", type=int)
+    parser.add_argument("--time-budget", type=float)
+    parser.add_argument("--find-duplicates", action="store_true",
+                        help="Hash tiles and warn about sets with identical content.")
+    parser.add_argument("--json", action="store_true", help="Print the plan as JSON.")
+    parser.add_argument("--strict", action="store_true",
+                        help="Exit 1 if any set has tile issues, can't be planned "
+                             "or nothing is found.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list) -> int:
+    args = parse_args(argv)
+    options = {k: v for k, v in (("max_files", args.max_files),
+                                 ("time_budget", args.time_budget)) if v is not None}
+    store, issues, warnings = scan(args.paths, args.full,
+                                   find_duplicates=args.find_duplicates, **options)
+    rows, skipped = select_rows(store, args.select, args.broadcaster, args.depth,
+                                args.colourspace)
+    nodes, backdrops = plan_rows(rows)
+    planned = {node.key for node in nodes}
+    issues = {key: found for key, found in issues.items() if key in planned}
+    for name, ext, root, unknown in skipped:
+        warnings.append(f"[Skipped] {name} ({ext}, {root}) unknown {' and '.join(unknown)}, "
+                        f"first tile unreadable")
+
+    if args.json:
+        print(json.dumps({
+            "nodes": [node.to_dict() for node in nodes],
+            "backdrops": [[b.x, b.y, b.w, b.h] for b in backdrops],
+            "issues": [[*key, found] for key, found in issues.items()],
+            "skipped": [list(s) for s in skipped],
+            "warnings": warnings}, indent=2))
+    else:
+        print_plan(nodes, issues, warnings)
+    return 1 if args.strict and (issues or skipped or not nodes) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,162 @@
+# Memory, disk and time estimates for importing texture sets, worked
+# out from table values and tile file sizes. Pure Python, no Mari or
+# Qt, like import_plan.
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Paint nodes hold RGBA whatever the source channels, at the node depth.
+PAINT_CHANNELS = 4
+
+# Import throughput in uncompressed bytes per second, used until real
+# imports have been timed. Each timed import moves the stored figure
+# THROUGHPUT_SMOOTHING of the way towards the new measurement.
+DEFAULT_THROUGHPUT = 200 * 1024 ** 2
+THROUGHPUT_SMOOTHING = 0.3
+STAT_WORKERS = 8
+
+
+class SetCost:
+    """Estimated cost of importing one texture set."""
+    __slots__ = ("name", "ext", "tiles", "memory", "disk", "seconds")
+
+    def __init__(self, name: str, ext: str, tiles: int, memory: int,
+                 disk: int=None, seconds: float=None):
+        self.name = name
+        self.ext = ext
+        self.tiles = tiles
+        self.memory = memory
+        self.disk = disk
+        self.seconds = seconds
+
+
+class BatchCost:
+    """Costs for a batch of sets with totals."""
+    def __init__(self, sets: list):
+        self.sets = sets
+        self.memory = sum(s.memory for s in sets)
+        self.disk = sum(s.disk or 0 for s in sets)
+        self.seconds = sum(s.seconds or 0 for s in sets)
+
+
+    def largest(self, count: int=3) -> list:
+        return sorted(self.sets, key=lambda s: s.memory, reverse=True)[:count]
+
+
+    def summary(self) -> str:
+        return (f"{len(self.sets)} sets, {format_bytes(self.memory)} in Mari, "
+                f"{format_bytes(self.disk)} read, about {format_seconds(self.seconds)}")
+
+
+def parse_size(size: str) -> tuple:
+    """(width, height) from a 'WxH' table value, None if unknown."""
+    try:
+        w, h = str(size).lower().split("x")
+        return int(w), int(h)
+    except ValueError:
+        return None
+
+
+def depth_bytes(depth: str) -> int:
+    """Bytes per channel from a '16-bit' table value."""
+    try:
+        return max(int(str(depth).split("-")[0]) // 8, 1)
+    except ValueError:
+        return 1
+
+
+def paint_bytes(size: str, depth: str, tiles: int) -> int:
+    """Uncompressed size of a paint node, 0 if size is unknown."""
+    wh = parse_size(size)
+    if not wh:
+        return 0
+    return wh[0] * wh[1] * PAINT_CHANNELS * depth_bytes(depth) * int(tiles)
+
+
+def proxy_size(width: int, height: int, res: int) -> tuple:
+    """Size fitting the longest side to res, tiles already
+    that small are kept as they are."""
+    scale = min(res / max(width, height), 1.0)
+    return max(int(width * scale), 1), max(int(height * scale), 1)
+
+
+def proxy_table_size(size: str, res: int) -> str:
+    """'WxH' table value a set of size is proxied at, None
+    if it is no larger than res or its size is unknown."""
+    wh = parse_size(size)
+    if not wh or max(wh) <= res:
+        return None
+    return "{}x{}".format(*proxy_size(*wh, res))
+
+
+def import_seconds(memory: int, throughput: float) -> float:
+    return memory / (throughput or DEFAULT_THROUGHPUT)
+
+
+def file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+def disk_bytes(paths: list, workers: int=STAT_WORKERS) -> list:
+    """Size of each path, stat in parallel for network mounts."""
+    if len(paths) < workers:
+        return [file_size(p) for p in paths]
+    with ThreadPoolExecutor(workers) as executor:
+        return list(executor.map(file_size, paths))
+
+
+def estimate_batch(rows: list, throughput: float=DEFAULT_THROUGHPUT) -> BatchCost:
+    """Costs for rows of selected table data, each with Name,
+    File Type, Size, Depth, Udim Count and files."""
+    all_paths = [p for row in rows for p in row["files"]]
+    sizes = iter(disk_bytes(all_paths))
+    sets = []
+    for row in rows:
+        memory = paint_bytes(row["Size"], row["Depth"], row["Udim Count"])
+        disk = sum(next(sizes) for _ in row["files"])
+        sets.append(SetCost(row["Name"], row["File Type"], int(row["Udim Count"]),
+                            memory, disk, import_seconds(memory, throughput)))
+    return BatchCost(sets)
+
+
+def load_throughput(path: str) -> float:
+    """Stored throughput, the default if none is saved yet."""
+    try:
+        with open(path) as f:
+            return float(json.load(f)["bytes_per_second"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return DEFAULT_THROUGHPUT
+
+
+def update_throughput(path: str, throughput: float, memory: int, seconds: float) -> float:
+    """Blend a timed import into throughput and save it,
+    returns the new figure. Tiny imports are too noisy."""
+    if memory <= 0 or seconds < 0.5:
+        return throughput
+    measured = memory / seconds
+    throughput += (measured - throughput) * THROUGHPUT_SMOOTHING
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"bytes_per_second": throughput}, f)
+    except OSError:
+        pass
+    return throughput
+
+
+def format_bytes(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} TB"
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m {seconds:02d}s"
@@ -0,0 +1,93 @@
+# Node graph layout for an import batch. Pure Python, no Mari or Qt,
+# so layouts can be checked and timed outside Mari.
+
+PAINT_NODE_X = -400
+BROADCAST_PAINT_NODE_X = 0
+BACKDROP_PADDING = 50
+
+
+class NodeLayout:
+    """Position and size of a single node on the graph."""
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: float, y: float, w: float, h: float):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+
+
+class SetLayout:
+    """Paint node and optional broadcaster for one texture set."""
+    __slots__ = ("paint", "broadcaster")
+
+    def __init__(self, paint: NodeLayout, broadcaster: NodeLayout=None):
+        self.paint = paint
+        self.broadcaster = broadcaster
+
+
+    def nodes(self) -> list:
+        return [n for n in (self.paint, self.broadcaster) if n]
+
+
+class ImportPlan:
+    """Layouts per set, in input order, plus backdrop bounds."""
+    def __init__(self, sets: list, backdrops: list):
+        self.sets = sets
+        self.backdrops = backdrops
+
+
+def placement_indexes(entries: list) -> list:
+    """Returns (paint_index, index) per entry, broadcaster sets
+    and plain sets are stacked in separate columns."""
+    indexes = []
+    with_broadcaster = 0
+    without_broadcaster = 0
+    for entry in entries:
+        if entry["broadcaster"]:
+            indexes.append((0, with_broadcaster))
+            with_broadcaster += 1
+        else:
+            indexes.append((without_broadcaster, 0))
+            without_broadcaster += 1
+    return indexes
+
+
+def bounding_box(nodes: list, padding: float=BACKDROP_PADDING) -> NodeLayout:
+    """Padded box around nodes."""
+    left = min(n.x for n in nodes)
+    top = min(n.y for n in nodes)
+    right = max(n.x + n.w for n in nodes)
+    bottom = max(n.y + n.h for n in nodes)
+    return NodeLayout(left - padding, top - padding,
+                      padding + (right - left) + padding,
+                      padding + (bottom - top) + padding)
+
+
+def plan_import(entries: list) -> ImportPlan:
+    """Lay out a batch. Each entry is a dict with 'broadcaster'
+    (bool), 'paint_size' (w, h) and 'broadcaster_size' (w, h)
+    for sets with a broadcaster. Sets with a broadcaster get
+    their own backdrop when the batch mixes both kinds."""
+    sets = []
+    for entry, (paint_index, index) in zip(entries, placement_indexes(entries)):
+        w, h = entry["paint_size"]
+        if entry["broadcaster"]:
+            y = h * index * 2
+            paint = NodeLayout(BROADCAST_PAINT_NODE_X, y, w, h)
+            bw, bh = entry["broadcaster_size"]
+            broadcaster = NodeLayout(w * 2, y, bw, bh)
+        else:
+            y = h * paint_index * 2
+            paint = NodeLayout(PAINT_NODE_X, y, w, h)
+            broadcaster = None
+        sets.append(SetLayout(paint, broadcaster))
+
+    with_broadcaster = [n for s in sets if s.broadcaster for n in s.nodes()]
+    without_broadcaster = [n for s in sets if not s.broadcaster for n in s.nodes()]
+    if with_broadcaster and without_broadcaster:
+        groups = [with_broadcaster, without_broadcaster]
+    else:
+        groups = [with_broadcaster + without_broadcaster]
+    backdrops = [bounding_box(nodes) for nodes in groups if nodes]
+    return ImportPlan(sets, backdrops)
@@ -8,8 +8,9 @@ def set_up_project():
     sys.modules["__main__"].__file__ = file_path
     file_parent = os.path.dirname(__file__)
     parent_dir = os.path.dirname(file_parent)
-    if parent_dir not in sys.path:
-        sys.path.append(parent_dir)
+    for path in (parent_dir, file_parent):
+        if path not in sys.path:
+            sys.path.append(path)
 
 def close_previous_app():
     """Close previous instance of application."""
@@ -26,24 +27,340 @@ close_previous_app()
 # === Imports ===
 import time
 import subprocess
+import socket
+import stat
+import tempfile
 import json
+import bisect
 import os
-import re
+import logging.handlers
 
 from pathlib import Path
-from PySide2 import QtWidgets
-from PySide2.QtCore import Qt, QTimer, Slot, QPointF, QSizeF
+from PySide2 import QtCore, QtWidgets
+from PySide2.QtCore import Qt, QTimer, Slot, Signal, QPointF, QSizeF, QThread
 from PySide2.QtGui import QBrush, QColor
 from datetime import datetime
 
 import backend
+from scan_store import ScanResultStore, tile_template, set_key, record_key, key_fields
+from import_core import COMBO_OPTIONS, table_row, import_rows, paint_node_size
+from import_plan import plan_import, placement_indexes
+from tile_prefetch import TilePrefetcher
+from scan_metrics import summarise
+from scan_snapshot import SnapshotError, save_snapshot, load_snapshot, stale_folders
+from import_cost import (DEFAULT_THROUGHPUT, estimate_batch, paint_bytes, import_seconds,
+                         load_throughput, update_throughput, format_bytes, format_seconds,
+                         parse_size, proxy_table_size)
 import mariCommon as mc
 import mari
 
 # === Constant / Global Variables === 
-# Example match / groups 'opacity.1001.tif' --> (opacity<name>)(.<sep>)(1001<udim>).(tif<ext>)
-TXT_REGEX = re.compile(r'^(?P<name>.+?)(?P<sep>[^0-9])(?P<udim>\d{4})\.(?P<ext>\w+)$', re.IGNORECASE)
 SCRIPT = "/path/to/run_search.py"
+SEARCH_ERRORS = {"InvalidPathError", "NoTargetFiles", "ZeroFileError",
+                 "SubprocessError", "WorkerError"}
+SEARCH_WARNINGS = {"MetadataError", "ImageFileNotFoundError", "CacheError", "DuplicateTiles",
+                   "HashError", "ProxyError", "ConvertError"}
+PYTHON_EXE = "python3.11"
+# The worker socket lives in a folder only this user can open, shared
+# by all of their Mari sessions.
+WORKER_SOCKET_NAME = "import_textures.sock"
+WORKER_IDLE_TIMEOUT = 1800
+WORKER_START_TIMEOUT = 20
+# Several roots can be scanned at once, separated by ROOTS_SEPARATOR in
+# the path box or listed one per line in a saved roots file.
+ROOTS_SEPARATOR = ";"
+ROOTS_FILE_FILTER = "Root lists (*.roots *.txt)"
+# Scans stop at whichever budget is hit first and show what was found
+# so far. None / 0 for no limit.
+SCAN_FILE_BUDGET = 200000
+SCAN_TIME_BUDGET = 300
+PREFETCH_WORKERS = 4
+PREFETCH_BUDGET_MB = 2048
+# Rows are a fixed height so sizing the table doesn't lay out every
+# row, it is sized to show at most TABLE_VISIBLE_ROWS and scrolls past.
+TABLE_ROW_HEIGHT = 26
+TABLE_VISIBLE_ROWS = 20
+# Last scan of each Mari project is kept here and reloaded on open.
+SNAPSHOT_DIR = os.path.join(os.path.expanduser("~"), ".import_textures", "snapshots")
+# Set to a path to append scan metrics as JSON lines for trend analysis.
+METRICS_FILE = None
+METRICS_MAX_BYTES = 1024 ** 2
+METRICS_BACKUPS = 5
+# Imports over IMPORT_WARN_GB of paint node memory ask first, over
+# IMPORT_MAX_GB are refused. None to turn either check off.
+IMPORT_WARN_GB = 8
+IMPORT_MAX_GB = 48
+# Proxy imports swap sets larger than PROXY_RES for tiles of that size
+# at PROXY_BITS, built by the search worker.
+PROXY_RES = 1024
+PROXY_BITS = 8
+# Measured import speed, kept so time estimates improve with use.
+THROUGHPUT_FILE = os.path.join(os.path.expanduser("~"), ".import_textures",
+                               "import_throughput.json")
+
+# === Search Worker ===
+
+def runtime_dir() -> str:
+    """Private folder for the worker socket, $XDG_RUNTIME_DIR
+    or a 0700 folder in the temp dir. A temp folder someone
+    else owns or can open is not used, a new one is made."""
+    path = os.environ.get("XDG_RUNTIME_DIR")
+    if path and os.path.isdir(path):
+        return path
+    path = os.path.join(tempfile.gettempdir(), f"import_textures_{os.getuid()}")
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+        if stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077:
+            return path
+    except OSError:
+        pass
+    return tempfile.mkdtemp(prefix="import_textures_")
+
+
+class RequestCancelled(ConnectionError):
+    """Worker request dropped by SearchWorker.cancel."""
+
+
+class SearchWorker:
+    """Client for a warm run_search worker listening on a unix
+    socket. Started on first use, restarted if it has died.
+    Never calls into Mari, safe to use from a QThread. The
+    caller clears cancelled before each run."""
+    def __init__(self, socket_path: str=None):
+        self.socket_path = socket_path or os.path.join(runtime_dir(), WORKER_SOCKET_NAME)
+        self.process = None
+        self.conn = None
+        self.cancelled = False
+
+
+    def request(self, payload: dict, timeout: float=None, on_record=None) -> list:
+        """Send request, return worker records. Raises if the
+        worker dies before finishing the request. on_record is
+        called with each record as it arrives."""
+        records = []
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(timeout)
+            # Set before connecting so a cancel from here on shuts it down.
+            self.conn = conn
+            try:
+                conn.connect(self.socket_path)
+                self.check_cancelled()
+                conn.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+                with conn.makefile("r", encoding="utf-8") as reader:
+                    for line in reader:
+                        record = parse_record(line)
+                        if record["type"] == "worker_done":
+                            return records
+                        records.append(record)
+                        if on_record:
+                            on_record(record)
+            finally:
+                self.conn = None
+        raise ConnectionError("Search worker exited before finishing request")
+
+
+    def is_alive(self) -> bool:
+        """Health check, worker answers ping. A worker too busy
+        with another session's request to answer in time is
+        alive. A ping dropped by cancel raises RequestCancelled
+        rather than counting the worker as dead."""
+        try:
+            records = self.request({"cmd": "ping"}, timeout=2)
+            return any(r["type"] == "pong" for r in records)
+        except (socket.timeout, BlockingIOError):
+            # Accepted but not answered, or its backlog is full.
+            self.check_cancelled()
+            return True
+        except OSError:
+            self.check_cancelled()
+            return False
+
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise RequestCancelled("Search worker request cancelled")
+
+
+    def start(self):
+        """Launch worker and wait until it answers."""
+        self.stop()
+        self.process = subprocess.Popen(
+            [PYTHON_EXE, SCRIPT, "--serve", self.socket_path,
+             "--idle-timeout", str(WORKER_IDLE_TIMEOUT)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True)
+        deadline = time.time() + WORKER_START_TIMEOUT
+        while time.time() < deadline:
+            self.check_cancelled()
+            if self.process.poll() is not None:
+                break
+            if self.is_alive():
+                return
+            time.sleep(0.05)
+        raise ConnectionError("Search worker failed to start")
+
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            self.process.wait()
+        self.process = None
+
+
+    def cancel(self):
+        """Drop the in flight request, the worker aborts the
+        scan as soon as it next writes output."""
+        self.cancelled = True
+        conn = self.conn
+        if conn:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+    def run(self, payload: dict, on_record=None) -> list:
+        """Run request on the warm worker, restarting it once
+        if it's not running or crashed mid request. Raises
+        RequestCancelled if cancelled before it connects."""
+        if not self.is_alive():
+            self.start()
+            if on_record:
+                on_record(debug_record(f"Search worker started: {self.process.pid}"))
+        self.check_cancelled()
+        try:
+            return self.request(payload, on_record=on_record)
+        except OSError as e:
+            if self.cancelled:
+                raise
+            if on_record:
+                on_record(debug_record(f"Restarting search worker: {e}"))
+            self.start()
+            return self.request(payload, on_record=on_record)
+
+
+class SearchThread(QThread):
+    """Runs a scan off the main thread, records are emitted
+    as they arrive so the GUI stays responsive."""
+    record_received = Signal(object)
+    search_done = Signal(str)
+
+    def __init__(self, worker: SearchWorker, paths: list, watch: bool=False,
+                 find_duplicates: bool=False, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.paths = paths
+        self.watch = watch
+        self.find_duplicates = find_duplicates
+        self.process = None
+        self.cancelled = False
+        self.start_time = time.time()
+
+
+    def run(self):
+        error = ""
+        # Cleared here, not by the worker, so a cancel made before
+        # the thread got going still counts.
+        self.worker.cancelled = self.cancelled
+        try:
+            if self.watch:
+                # Runs until cancelled, kept off the shared worker.
+                self.run_subprocess()
+            else:
+                self.run_worker()
+        except Exception as e:
+            if not self.cancelled:
+                error = str(e)
+        self.search_done.emit(error)
+
+
+    def run_worker(self):
+        try:
+            self.worker.run({"cmd": "scan", "paths": self.paths,
+                             "max_files": SCAN_FILE_BUDGET,
+                             "time_budget": SCAN_TIME_BUDGET,
+                             "find_duplicates": self.find_duplicates},
+                            self.record_received.emit)
+        except OSError as e:
+            if self.cancelled:
+                raise
+            self.record_received.emit(
+                debug_record(f"Worker unavailable, running subprocess: {e}"))
+            self.run_subprocess()
+
+
+    def run_subprocess(self):
+        """One off search process, used if the worker is down
+        and for watching."""
+        args = [PYTHON_EXE, SCRIPT, "--max-files", str(SCAN_FILE_BUDGET or 0)]
+        if SCAN_TIME_BUDGET:
+            args += ["--time-budget", str(SCAN_TIME_BUDGET)]
+        if self.watch:
+            args.append("--watch")
+        if self.find_duplicates:
+            args.append("--find-duplicates")
+        args += ["--", *self.paths]
+        self.process = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+        for line in self.process.stdout:
+            self.record_received.emit(parse_record(line))
+        returncode = self.process.wait()
+        if returncode and not self.cancelled:
+            raise subprocess.CalledProcessError(returncode, args)
+
+
+    def cancel(self):
+        self.cancelled = True
+        self.worker.cancel()
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+
+
+class TileThread(QThread):
+    """Runs a proxy or convert request on the worker off the
+    main thread, progress records are emitted as they arrive.
+    The full list is in records once tiles_done is emitted."""
+    record_received = Signal(object)
+    tiles_done = Signal(str)
+
+    def __init__(self, worker: SearchWorker, payload: dict, parent=None):
+        super().__init__(parent)
+        self.worker = worker
+        self.payload = payload
+        self.records = []
+        self.cancelled = False
+
+
+    def run(self):
+        error = ""
+        self.worker.cancelled = self.cancelled
+        try:
+            self.records = self.worker.run(self.payload, self.record_received.emit)
+        except Exception as e:
+            if not self.cancelled:
+                error = str(e) or type(e).__name__
+        self.tiles_done.emit(error)
+
+
+    def cancel(self):
+        self.cancelled = True
+        self.worker.cancel()
+
+
+def parse_record(line: str) -> dict:
+    """Decode a run_search NDJSON record, stray text
+    (tracebacks etc.) becomes a debug log record."""
+    try:
+        record = json.loads(line)
+        if isinstance(record, dict) and "type" in record:
+            return record
+    except ValueError:
+        pass
+    return debug_record(line.rstrip("\n"))
+
+
+def debug_record(msg: str) -> dict:
+    return {"type": "log", "flag": "DEBUG", "msg": msg}
 
 # === Widgets ===
 
@@ -78,65 +395,334 @@ class ToolButton(QtWidgets.QToolButton):
         self.hide()
 
 
-class TableWidget(QtWidgets.QTableWidget):
+class TextureSetModel(QtCore.QAbstractTableModel):
+    """Table rows for scanned texture sets. Checkbox and combo
+    columns are plain model state, drawn by delegates."""
+    COMBO_OPTIONS = COMBO_OPTIONS
+    # Worked out from each row's size, depth and udim count.
+    COST_COLUMNS = ("Memory", "Est. Time")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.headers = []
+        self.rows = []
+        self.row_keys = []
+        self.issues = {}
+        self.duplicates = {}
+        self.throughput = DEFAULT_THROUGHPUT
+
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers) + 2
+
+
+    def header(self, column: int) -> str:
+        if column == 0:
+            return ""
+        elif column == len(self.headers) + 1:
+            return "Broadcaster"
+        return self.headers[column - 1]
+
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.header(section)
+        return None
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        header = self.header(index.column())
+        if header in ("", "Broadcaster"):
+            if role == Qt.CheckStateRole:
+                key = "Selected" if header == "" else header
+                return Qt.Checked if row[key] else Qt.Unchecked
+            return None
+
+        key = self.row_keys[index.row()]
+        issues = self.issues.get(key)
+        duplicate_of = self.duplicates.get(key)
+        if role in (Qt.DisplayRole, Qt.EditRole) and header in self.COST_COLUMNS:
+            return self.cost_text(row, header)
+        elif role in (Qt.DisplayRole, Qt.EditRole):
+            return str(row.get(header, ""))
+        elif role == Qt.ForegroundRole:
+            colour = "#dbdbdb"
+            if header == "Name" and issues:
+                colour = "#e06c60"
+            elif header == "Name" and duplicate_of:
+                colour = "#e5c07b"
+            return QBrush(QColor(colour))
+        elif role == Qt.ToolTipRole and (issues or duplicate_of):
+            lines = list(issues or [])
+            if duplicate_of:
+                lines.append(f"Same content as {duplicate_of[3]}")
+            return "\n".join(lines)
+        return None
+
+
+    def flags(self, index):
+        header = self.header(index.column())
+        flags = Qt.ItemIsEnabled
+        if header in ("", "Broadcaster"):
+            flags |= Qt.ItemIsUserCheckable
+        elif header in self.COMBO_OPTIONS:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+
+    def setData(self, index, value, role=Qt.EditRole):
+        row = self.rows[index.row()]
+        header = self.header(index.column())
+        if role == Qt.CheckStateRole and header in ("", "Broadcaster"):
+            key = "Selected" if header == "" else header
+            row[key] = value == Qt.Checked
+        elif role == Qt.EditRole and header in self.COMBO_OPTIONS:
+            row[header] = value
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        if header == "Depth":
+            self.refresh_costs(index.row(), index.row())
+        return True
+
+
+    def cost_text(self, row: dict, header: str) -> str:
+        memory = paint_bytes(row.get("Size"), row.get("Depth"), row.get("Udim Count", 0))
+        if not memory:
+            return ""
+        elif header == "Memory":
+            return format_bytes(memory)
+        return format_seconds(import_seconds(memory, self.throughput))
+
+
+    def refresh_costs(self, first: int=0, last: int=None):
+        """Redraw cost columns, after a depth or throughput change."""
+        last = len(self.rows) - 1 if last is None else last
+        if self.rows and self.headers:
+            columns = [self.headers.index(h) + 1 for h in self.COST_COLUMNS]
+            self.dataChanged.emit(self.index(first, min(columns)),
+                                  self.index(last, max(columns)))
+
+
+    def set_throughput(self, throughput: float):
+        self.throughput = throughput
+        self.refresh_costs()
+
+
+    def clear(self):
+        self.beginResetModel()
+        self.rows = []
+        self.row_keys = []
+        self.issues = {}
+        self.duplicates = {}
+        self.endResetModel()
+
+
+    def append_row(self, key: tuple, row_dict: dict) -> int:
+        """Insert row for the set with key, see scan_store.set_key,
+        keeping table sorted by key. Returns the row index."""
+        if not self.headers:
+            self.beginResetModel()
+            self.headers = list(row_dict.keys()) + list(self.COST_COLUMNS)
+            self.endResetModel()
+
+        row = table_row(row_dict)
+        row_index = bisect.bisect(self.row_keys, key)
+        self.beginInsertRows(QtCore.QModelIndex(), row_index, row_index)
+        self.row_keys.insert(row_index, key)
+        self.rows.insert(row_index, row)
+        self.endInsertRows()
+        return row_index
+
+
+    def update_row(self, key: tuple, row_dict: dict) -> int:
+        """Refresh the row for a set in place, keeping its check
+        states, or insert it if new. Returns the row index."""
+        row_index = bisect.bisect_left(self.row_keys, key)
+        if row_index == len(self.rows) or self.row_keys[row_index] != key:
+            return self.append_row(key, row_dict)
+
+        row = self.rows[row_index]
+        for header, value in row_dict.items():
+            options = self.COMBO_OPTIONS.get(header)
+            row[header] = value if not options or value in options else options[0]
+        self.dataChanged.emit(self.index(row_index, 0),
+                              self.index(row_index, self.columnCount() - 1))
+        return row_index
+
+
+    def remove_row(self, key: tuple):
+        row_index = bisect.bisect_left(self.row_keys, key)
+        if row_index < len(self.rows) and self.row_keys[row_index] == key:
+            self.beginRemoveRows(QtCore.QModelIndex(), row_index, row_index)
+            del self.row_keys[row_index]
+            del self.rows[row_index]
+            self.endRemoveRows()
+
+
+    def set_issues(self, issues: dict):
+        """Flag rows, issues keyed by set key."""
+        self.issues = issues
+        self.refresh_rows()
+
+
+    def set_duplicates(self, duplicates: dict):
+        """Flag copies, the key of the set each copies keyed
+        by set key."""
+        self.duplicates = duplicates
+        self.refresh_rows()
+
+
+    def refresh_rows(self):
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0),
+                                  self.index(len(self.rows) - 1, self.columnCount() - 1))
+
+
+    def is_checked(self, row: int, column: int) -> bool:
+        key = "Selected" if column == 0 else "Broadcaster"
+        return self.rows[row][key]
+
+
+    def set_column_checked(self, column: int, checked: bool):
+        key = "Selected" if column == 0 else "Broadcaster"
+        for row in self.rows:
+            row[key] = checked
+        if self.rows:
+            self.dataChanged.emit(self.index(0, column),
+                                  self.index(len(self.rows) - 1, column),
+                                  [Qt.CheckStateRole])
+
+
+    def row_data(self, row: int) -> dict:
+        """Row values keyed by header, as shown in the table,
+        and the set key in 'key'."""
+        values = self.rows[row]
+        row_data = {h: str(values.get(h, "")) for h in self.headers
+                    if h not in self.COST_COLUMNS}
+        row_data["Broadcaster"] = values["Broadcaster"]
+        row_data["key"] = self.row_keys[row]
+        return row_data
+
+
+class CheckBoxDelegate(QtWidgets.QStyledItemDelegate):
+    """Centered checkbox painted from the model check state."""
+    def paint(self, painter, option, index):
+        style = QtWidgets.QApplication.style()
+        checked = index.data(Qt.CheckStateRole) == Qt.Checked
+        opt = QtWidgets.QStyleOptionButton()
+        opt.state = QtWidgets.QStyle.State_Enabled
+        opt.state |= QtWidgets.QStyle.State_On if checked else QtWidgets.QStyle.State_Off
+        size = style.subElementRect(QtWidgets.QStyle.SE_CheckBoxIndicator, opt, None).size()
+        opt.rect = QtCore.QRect(option.rect.center().x() - size.width() // 2,
+                                option.rect.center().y() - size.height() // 2,
+                                size.width(), size.height())
+        style.drawControl(QtWidgets.QStyle.CE_CheckBox, opt, painter)
+
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QtCore.QEvent.MouseButtonRelease \
+                and option.rect.contains(event.pos()):
+            checked = index.data(Qt.CheckStateRole) == Qt.Checked
+            state = Qt.Unchecked if checked else Qt.Checked
+            return model.setData(index, state, Qt.CheckStateRole)
+        return False
+
+
+class ComboBoxDelegate(QtWidgets.QStyledItemDelegate):
+    """Combo box editor, only exists while the cell is edited."""
+    def __init__(self, options: list, parent=None):
+        super().__init__(parent)
+        self.options = options
+
+
+    def createEditor(self, parent, option, index):
+        combo = QtWidgets.QComboBox(parent)
+        combo.setStyleSheet("color: #dbdbdb;")
+        combo.addItems(self.options)
+        combo.activated.connect(lambda: (self.commitData.emit(combo),
+                                         self.closeEditor.emit(combo)))
+        return combo
+
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.EditRole))
+        editor.showPopup()
+
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
+
+
+class TableView(QtWidgets.QTableView):
     def __init__(self):
         super().__init__()
         self.horizontalHeader().setStretchLastSection(True)
         self.horizontalHeader().setMinimumHeight(27)
         self.verticalHeader().setVisible(False)
+        self.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(TABLE_ROW_HEIGHT)
         self.horizontalHeader().setStyleSheet("""color: #dbdbdb; 
                                                font-weight: bold;""")
         self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
-        self.setColumnCount(8)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.AllEditTriggers)
+        self.setModel(TextureSetModel(self))
+        self.model().modelReset.connect(self.set_delegates)
         self.hide()
 
 
-    def add_checkboxes(self, data):
-        for row_index, _ in enumerate(data):
-            checkbox_a = QtWidgets.QTableWidgetItem()
-            checkbox_a.setFlags(Qt.ItemIsSelectable)
-            checkbox_a.setForeground(QBrush(QColor("#dbdbdb")))
-            checkbox_a.setFlags(Qt.ItemFlag.ItemIsUserCheckable | Qt.ItemFlag.ItemIsEnabled)
-            checkbox_a.setText("")
-            checkbox_a.setCheckState(Qt.CheckState.Unchecked)
-            self.setItem(row_index, 0, checkbox_a)
-            
-            checkbox_b = QtWidgets.QCheckBox()
-            checkbox_b.setStyleSheet("margin-left:50%; mrgin-right:50%;")
-            self.setCellWidget(row_index, 7, checkbox_b)
-    
+    def set_delegates(self):
+        """Delegates per column, headers are known after the first row."""
+        model = self.model()
+        for column in range(model.columnCount()):
+            header = model.header(column)
+            if header in ("", "Broadcaster"):
+                delegate = CheckBoxDelegate(self)
+            elif header in model.COMBO_OPTIONS:
+                delegate = ComboBoxDelegate(model.COMBO_OPTIONS[header], self)
+            else:
+                continue
+            self.setItemDelegateForColumn(column, delegate)
+
 
-    def populate_table(self, data):
-        if not data:
+    def populate_table(self, texture_sets: list):
+        if not texture_sets:
             return
 
-        headers = list(data[0].keys())
-        self.setRowCount(len(data))
-        self.setHorizontalHeaderLabels([""] + headers + ["Broadcaster"])
-        self.add_checkboxes(data)
-        
-        combo_col = self.return_combo_dict()
-        for row_index, row_dict in enumerate(data):
-            for col_index, key in enumerate(headers):
-                if key in combo_col:
-                    combo = QtWidgets.QComboBox()
-                    combo.setStyleSheet("color: #dbdbdb;")
-                    combo.addItems(combo_col[key])
-                    image_value = str(row_dict.get(key, ""))
-                    combo.setCurrentText(image_value)
-                    self.setCellWidget(row_index, col_index + 1, combo)
-                else:
-                    value = row_dict.get(key, "")
-                    item = QtWidgets.QTableWidgetItem(str(value))
-                    item.setFlags(Qt.ItemIsSelectable)
-                    item.setForeground(QBrush(QColor("#dbdbdb")))
-                    self.setItem(row_index, col_index + 1, item)
-    
+        self.clear_rows()
+        for texture_set in texture_sets:
+            self.append_row(texture_set.key, texture_set.summary)
+
+
+    def clear_rows(self):
+        self.model().clear()
 
-    def return_combo_dict(self):
-        """Returns options for selection box."""
-        return {"Depth": ["8-bit", "16-bit", "32-bit"],
-                "Colourspace": ["color", "scalar"]}
+
+    def append_row(self, key: tuple, row_dict: dict) -> int:
+        return self.model().append_row(key, row_dict)
+
+
+    def update_row(self, key: tuple, row_dict: dict) -> int:
+        return self.model().update_row(key, row_dict)
+
+
+    def remove_row(self, key: tuple):
+        self.model().remove_row(key)
+
+
+    def rowCount(self) -> int:
+        return self.model().rowCount()
+
+
+    def columnCount(self) -> int:
+        return self.model().columnCount()
     
 # === Main Window ===
 
@@ -157,6 +743,35 @@ class MainWindow(QtWidgets.QWidget):
         self.browse_btn.setText("Browse")
         self.import_btn = Button()
         self.import_btn.setText("Import")
+        self.proxy_checkbox = QtWidgets.QCheckBox(f"Proxy {PROXY_RES // 1024}K")
+        self.proxy_checkbox.setToolTip("Import downscaled proxy tiles, "
+                                       "Full Res swaps in the originals later.")
+        self.proxy_checkbox.setStyleSheet("color: white;")
+        self.upgrade_btn = Button()
+        self.upgrade_btn.setText("Full Res")
+        self.upgrade_btn.setToolTip("Re-import original tiles into nodes imported as proxies.")
+        self.upgrade_btn.hide()
+        self.convert_checkbox = QtWidgets.QCheckBox("Pre-convert")
+        self.convert_checkbox.setToolTip("Convert tiles to the node size and depth on all "
+                                         "cores first, instead of on Mari's import thread.")
+        self.convert_checkbox.setStyleSheet("color: white;")
+        self.cancel_btn = Button()
+        self.cancel_btn.setText("Cancel")
+        self.cancel_btn.hide()
+        self.roots_btn = Button()
+        self.roots_btn.setText("Roots")
+        roots_menu = QtWidgets.QMenu(self.roots_btn)
+        roots_menu.addAction("Add Folder...", self.add_root_folder)
+        roots_menu.addAction("Load List...", self.load_roots)
+        roots_menu.addAction("Save List...", self.save_roots)
+        self.roots_btn.setMenu(roots_menu)
+        self.watch_checkbox = QtWidgets.QCheckBox("Watch")
+        self.watch_checkbox.setToolTip("Keep scanning, rows update as tiles are exported.")
+        self.watch_checkbox.setStyleSheet("color: white;")
+        self.duplicates_checkbox = QtWidgets.QCheckBox("Duplicates")
+        self.duplicates_checkbox.setToolTip("Hash tiles to flag sets with identical content, "
+                                            "the first scan of a library reads every tile.")
+        self.duplicates_checkbox.setStyleSheet("color: white;")
 
 
         self.select_all_btn = ToolButton()
@@ -165,7 +780,7 @@ class MainWindow(QtWidgets.QWidget):
         self.broadcaster_btn.setText("Connect all Broadcasters")
         self.broadcaster_btn.setFixedSize(150, 20)
 
-        self.table_widget = TableWidget()
+        self.table_widget = TableView()
 
         self.status_label = QtWidgets.QLabel()
         self.status_label.setStyleSheet("color: gray; " \
@@ -176,6 +791,9 @@ class MainWindow(QtWidgets.QWidget):
         top_layout.addWidget(self.path_input_box)
         top_layout.addWidget(self.search_btn)
         top_layout.addWidget(self.browse_btn)
+        top_layout.addWidget(self.roots_btn)
+        top_layout.addWidget(self.watch_checkbox)
+        top_layout.addWidget(self.duplicates_checkbox)
 
         second_row = QtWidgets.QHBoxLayout()
         second_row.addWidget(self.select_all_btn, alignment=Qt.AlignLeft)
@@ -186,6 +804,10 @@ class MainWindow(QtWidgets.QWidget):
 
         bottom_layout = QtWidgets.QHBoxLayout()
         bottom_layout.addWidget(self.status_label)
+        bottom_layout.addWidget(self.cancel_btn)
+        bottom_layout.addWidget(self.convert_checkbox)
+        bottom_layout.addWidget(self.proxy_checkbox)
+        bottom_layout.addWidget(self.upgrade_btn)
         bottom_layout.addWidget(self.import_btn)
     
         main_layout = QtWidgets.QVBoxLayout()
@@ -204,23 +826,40 @@ class MainWindow(QtWidgets.QWidget):
             self.search_btn.clicked.connect(self.search_btn_clicked)
             self.select_all_btn.clicked.connect(self.select_all_checkboxes)
             self.import_btn.clicked.connect(self.import_btn_selected)
+            self.upgrade_btn.clicked.connect(self.upgrade_to_full_res)
             self.broadcaster_btn.clicked.connect(self.select_all_broadcaster)
+            self.cancel_btn.clicked.connect(self.cancel_search)
             self._connected = True
 
-        if not hasattr(self, "_data_source"):
-            self._data_source = None
+        self.scan_store = ScanResultStore()
+        self._verify_issues = {}
+        self._verify_done = False
+        self._duplicates = {}
+        self._proxy_nodes = []
+        self.search_worker = SearchWorker()
+        self._search_thread = None
+        self._tile_thread = None
+        self._import_data = None
+        self._import_proxy = False
+        self._import_steps = []
+        self._import_apply = None
+        self._progress = {}
+        self._gui_metrics = {}
+        self._budget_reached = None
+        self.metrics_log = make_metrics_log(METRICS_FILE)
+        self.import_throughput = load_throughput(THROUGHPUT_FILE)
+        self.table_widget.model().set_throughput(self.import_throughput)
+        QTimer.singleShot(0, self.load_project_snapshot)
 
 # === Widget Methods ===
 
     def update_status(self, message):
-        """Updates label with input message, also refreshes
-        GUI, and adds sleep for readability."""
+        """Updates label with input message."""
         label = getattr(self, "status_label")
         if message:
             QTimer.singleShot(0, lambda: (label.setText(str(message)),
                                         label.repaint() 
                                         ))
-            QtWidgets.QApplication.processEvents()
     
 
     def hide_table(self):
@@ -241,16 +880,16 @@ class MainWindow(QtWidgets.QWidget):
 
     
     def adjust_table_size(self):
-        for col in range(1, 6):
+        """Size the window to the columns and up to
+        TABLE_VISIBLE_ROWS fixed height rows."""
+        columns = self.table_widget.columnCount()
+        for col in range(1, columns - 2):
             self.table_widget.setColumnWidth(col, 100)
-        self.table_widget.resizeRowsToContents()
 
-        max_height = 0
-        for row in range(self.table_widget.rowCount()):
-            max_height += self.table_widget.rowHeight(row)
-        
+        max_height = min(self.table_widget.rowCount(), TABLE_VISIBLE_ROWS) * TABLE_ROW_HEIGHT
+
         max_width = 0
-        for col in range(0, 8):
+        for col in range(0, columns):
             max_width += self.table_widget.columnWidth(col)
 
         self.table_widget.setColumnWidth(0, 24)
@@ -274,162 +913,640 @@ class MainWindow(QtWidgets.QWidget):
 
         self.browse_btn.enable_button()
 
+
+    def current_roots(self) -> list:
+        return split_roots(self.path_input_box.text())
+
+
+    @Slot()
+    def add_root_folder(self):
+        """Add a folder to the roots being scanned."""
+        input_path = QtWidgets.QFileDialog.getExistingDirectory(self, "Add folder")
+        if input_path:
+            roots = self.current_roots() + [input_path]
+            self.path_input_box.setText(f"{ROOTS_SEPARATOR} ".join(roots))
+
+
+    @Slot()
+    def load_roots(self):
+        roots_file, _ = QtWidgets.QFileDialog.getOpenFileName(
+            self, "Load roots", "", ROOTS_FILE_FILTER)
+        if roots_file:
+            roots = read_roots_file(roots_file)
+            self.path_input_box.setText(f"{ROOTS_SEPARATOR} ".join(roots))
+
+
+    @Slot()
+    def save_roots(self):
+        roots = self.current_roots()
+        if not roots:
+            self.update_status("No roots to save")
+            return
+        roots_file, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Save roots", "", ROOTS_FILE_FILTER)
+        if roots_file:
+            try:
+                write_roots_file(roots_file, roots)
+                self.update_status(f"Saved {len(roots)} roots")
+            except OSError as e:
+                mc.utils.warn("[ERROR]", e)
+                self.update_status(str(e))
+
 # === Image Search Subprocess ===
     
     @Slot()
     def search_btn_clicked(self):
-        """Runs image search and populates table in GUI."""
+        """Starts image search in the background, rows are
+        added to the table as texture sets arrive."""
         self.search_btn.disable_button()
 
-        path = self.return_search_path()
-        begin_search = path and not getattr(self, "self._running", False)
+        paths = self.return_search_paths()
+        begin_search = paths and self._search_thread is None and self._tile_thread is None
 
         if begin_search:
-            self._running = True
-            self.update_status(f"Searching: {path}")
-            self.run_search(path)
-            self.configure_table_widget()
-
+            self.update_status(f"Searching: {', '.join(paths)}")
+            self.start_search(paths)
+        else:
+            self.search_btn.enable_button()
+
+
+    def start_search(self, paths: list):
+        """Reset results and run search on a background thread."""
+        self._progress = {}
+        self._gui_metrics = {}
+        self._budget_reached = None
+        self._verify_issues = {}
+        self._verify_done = False
+        self._duplicates = {}
+        self.scan_store.clear()
+        self.table_widget.clear_rows()
+
+        thread = SearchThread(self.search_worker, paths, self.watch_checkbox.isChecked(),
+                              self.duplicates_checkbox.isChecked(), self)
+        thread.record_received.connect(self.search_record)
+        thread.search_done.connect(self.search_finished)
+        self._search_thread = thread
+        self.cancel_btn.show()
+        thread.start()
+
+
+    @Slot(object)
+    def search_record(self, record: dict):
+        """Handle a single record streamed from run_search."""
+        record_type = record.get("type")
+        if record_type == "set":
+            self.add_texture_set(record)
+        elif record_type == "removed":
+            self.remove_texture_set(record)
+        elif record_type == "progress":
+            self.show_progress(record)
+        elif record_type == "verify":
+            self._verify_issues.setdefault(record_key(record), []).append(
+                f"{record['udim']} {record['issue']}")
+        elif record_type == "verify_done":
+            self._verify_done = True
+            summary = f"{record['tiles']} tiles checked, {record['issues']} issues"
+            mc.utils.info(f"[Verify] {summary}")
+            self.update_status(f"Verified: {summary}")
+            self.mark_verify_issues()
+        elif record_type == "duplicates":
+            self.add_duplicates(record["sets"])
+        elif record_type == "metrics":
+            self.log_metrics(record)
+        elif record_type == "log":
+            self.handle_log_record(record["flag"], record["msg"])
+
+
+    def add_texture_set(self, record: dict):
+        """Store set tiles and add or refresh its table row."""
+        start = time.perf_counter()
+        texture_set = self.scan_store.add_record(record)
+        self.table_widget.update_row(texture_set.key, texture_set.summary)
+        if self.table_widget.rowCount() == 1:
+            self.show_table()
+        self.schedule_table_resize()
+
+        gui = self._gui_metrics
+        gui.setdefault("first_set_s", round(time.time() - self._search_thread.start_time, 4))
+        gui["table_s"] = gui.get("table_s", 0.0) + time.perf_counter() - start
+        gui["rows"] = self.table_widget.rowCount()
+
+
+    def remove_texture_set(self, record: dict):
+        """Set lost all its tiles while watching."""
+        key = record_key(record)
+        self.scan_store.remove(key)
+        self._verify_issues.pop(key, None)
+        self._duplicates.pop(key, None)
+        self.table_widget.remove_row(key)
+        self.schedule_table_resize()
+
+
+    def schedule_table_resize(self):
+        """Resize once per burst of rows rather than per row."""
+        if not getattr(self, "_resize_pending", False):
+            self._resize_pending = True
+            QTimer.singleShot(200, self.resize_table)
+
+
+    def resize_table(self):
+        self._resize_pending = False
+        self.adjust_table_size()
+
+
+    def show_progress(self, record: dict):
+        """Show files walked / headers probed with an ETA."""
+        if record["stage"] == "walked":
+            self.update_status(f"Walked {record['done']} files")
+        elif record["stage"] == "probed":
+            done, total = record["done"], record["total"]
+            now = time.time()
+            start = self._progress.setdefault("probe_start", now)
+            msg = f"Probed {done}/{total} headers"
+            if done and now > start:
+                eta = (total - done) / (done / (now - start))
+                msg += f", ETA {eta:.0f}s"
+            self.update_status(msg)
+        elif record.get("total"):
+            self.update_status(f"{record['stage'].capitalize()} "
+                               f"{record['done']}/{record['total']} tiles")
+
+
+    @Slot(str)
+    def search_finished(self, error: str):
+        """Search thread has exited."""
+        thread = self._search_thread
+        self._search_thread = None
+        if not self._tile_thread:
+            self.cancel_btn.hide()
         self.search_btn.enable_button()
 
+        elapsed = time.time() - thread.start_time
+        mc.utils.info(f"Subprocess time elapsed: {elapsed:.2f} seconds")
 
-    def configure_table_widget(self):
-        """Populate table with image search result and adjust sizing."""
-        if getattr(self, "_update_table", True):
-            self.table_data = self.configure_table_info(self.data_dict)
-            self.table_widget.populate_table(self.table_data)
+        if thread.cancelled:
+            self.update_status("Stopped watching" if thread.watch else "Scan cancelled")
+        elif error:
+            mc.utils.warn(f"\n[SubprocessException] {error}'")
+            self.update_status(error)
+        elif self.scan_store:
             self.adjust_table_size()
-            self.show_table()
+            if self._budget_reached:
+                self.update_status(f"Partial results: {self._budget_reached}")
 
+        if self.scan_store and not error and (thread.watch or not thread.cancelled):
+            self.save_project_snapshot(thread.paths)
 
-    def run_search(self, path=None):
-        """Run search subprocess."""
-        try:
-            search_process = self.execute_subprocess(path)
-            self.handle_process_output(search_process.stdout)
-            self.data_dict = self.read_data()
-        except Exception as e:
-            mc.utils.warn(f"\n[SubprocessException] {str(e)}'")
-            mc.utils.info(search_process.stdout)
-        finally:
-            self._running = False
 
-    
-    def execute_subprocess(self, path):
-        """Execute and time search."""
-        start_time = time.time()
-        process = subprocess.run(
-            ["python3.11", SCRIPT, path], capture_output=True,                        
-            text=True, check=True)
-        end_time = time.time()
-        elapsed = end_time - start_time
-        mc.utils.info(f"Subprocess time elapsed: {elapsed:.2f} seconds")
-        return process
-    
-
-    def handle_process_output(self, process_output):
-        """Read output from subprocess, handle errors."""
-        self._process_info = self.read_feedback(process_output)
-        self.find_errors(self._process_info)
-        self.check_data_path(self._process_info)
-
-
-    def find_errors(self, process_info: dict):
-        """Read errors and raise excepctions."""
-        for flag, msg in process_info.items():
-            if flag == "InvalidPathError":
-                self.handle_message(flag, msg, update=False)
-                raise Exception(flag, msg)
-            elif flag == "NoTargetFiles":
-                self.handle_message(flag, msg, update=False)
-                raise Exception(flag, msg)
-            elif flag == "MaxFileError":
-                self.handle_message(flag, msg, update=False)
-                raise Exception(flag, msg)
-            elif flag == "ZeroFileError":
-                self.handle_message(flag, msg, update=False)
-                raise Exception(flag, msg)
-            elif flag == "MetadataError":
-                self.handle_message(flag, msg, update=False)
-                raise Exception(flag, msg)
-            
-    
-    def check_data_path(self, process_info: dict):
-        """Check data file with image search result."""
-        if process_info["DataPath"]:
-            data_path = Path(process_info["DataPath"])
-            if data_path.exists():
-                msg = f"Loading: {str(data_path)}"
-                self.handle_message("[DataPath]", msg, update=True)
-                self.clean_up_data()
-                self._data_source = data_path
-            else:
-                raise Exception("[ErrorPathRead] failed to find path")
-
-    
-    def read_feedback(self, stdout: str):
-        """Read stdout from subprocess."""
-        output = stdout.strip().splitlines()
-        ignore_flags = ["DEBUG", "INFO"]
-        process_info = {line.split("] ")[0][1:]: line.split("] ", 1)[1] 
-                            for line in output
-                            if line.split("] ")[0][1:] 
-                            not in ignore_flags}
-        return process_info
+    @Slot()
+    def cancel_search(self):
+        """Stop the in flight import preparation, or search."""
+        if self._tile_thread:
+            self.update_status("Cancelling import...")
+            self._tile_thread.cancel()
+            return
+        thread = self._search_thread
+        if thread:
+            self.update_status("Cancelling scan...")
+            thread.cancel()
+
+
+    def log_metrics(self, record: dict):
+        """Log scan metrics with GUI side timings added, and
+        keep them in the metrics file if one is set."""
+        gui = dict(self._gui_metrics)
+        gui["table_s"] = round(gui.get("table_s", 0.0), 4)
+        gui["elapsed_s"] = round(time.time() - self._search_thread.start_time, 4)
+        record = dict(record, gui=gui, paths=self._search_thread.paths,
+                      time=datetime.now().isoformat(timespec="seconds"))
+        mc.utils.info(f"[Metrics] {summarise(record)}")
+        mc.utils.info(f"[Metrics] gui {gui}")
+        if self.metrics_log:
+            self.metrics_log.info(json.dumps(record))
+
+
+    def handle_log_record(self, flag: str, msg: str):
+        """Display errors, ignore debug output."""
+        if flag in ("DEBUG", "INFO"):
+            return
+        if flag == "Watching":
+            self.update_status(f"Watching: {msg}")
+            mc.utils.info(f"[{flag}] {msg}")
+        elif flag == "BudgetReached":
+            self._budget_reached = msg
+            mc.utils.info(f"[{flag}] {msg}")
+        elif flag in SEARCH_ERRORS:
+            self.handle_message(flag, msg)
+        elif flag in SEARCH_WARNINGS:
+            mc.utils.info(f"[{flag}] {msg}")
         
 
-    def handle_message(self, flag, message: str, update: bool):
+    def handle_message(self, flag, message: str):
         """Display and log subproccess messages."""
         self.update_status(f"{flag} {message}")
         mc.utils.info(f"{flag} {message}")
-        self._update_table = update
                     
+# === Scan Snapshots ===
+
+    def save_project_snapshot(self, roots: list):
+        """Keep the scan so reopening the project skips it. A
+        scan stopped by a budget is marked partial."""
+        path = snapshot_path()
+        if not path:
+            return
+        meta = {"roots": roots,
+                "saved": datetime.now().isoformat(timespec="seconds"),
+                "partial": self._budget_reached,
+                "issues": [[*key, issues] for key, issues in self._verify_issues.items()],
+                "duplicates": [[copy, of] for copy, of in self._duplicates.items()]}
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            save_snapshot(path, self.scan_store.sets.values(), meta)
+        except OSError as e:
+            mc.utils.info(f"[SnapshotError] Could not save scan: {e}")
+
+
+    def load_project_snapshot(self):
+        """Show the project's last scan unless folders have
+        changed since, in which case a rescan is needed."""
+        path = snapshot_path()
+        if not path or not os.path.exists(path) or self._search_thread:
+            return
+        try:
+            meta, sets, folders = load_snapshot(path)
+        except (OSError, SnapshotError) as e:
+            mc.utils.info(f"[SnapshotError] {e}")
+            return
+
+        roots = meta.get("roots", [])
+        self.path_input_box.setText(f"{ROOTS_SEPARATOR} ".join(roots))
+        stale = stale_folders(folders)
+        if stale:
+            mc.utils.info(f"[Snapshot] {len(stale)} folders changed since {meta.get('saved')}")
+            self.update_status("Saved scan is out of date, scan to refresh")
+            return
+
+        self.scan_store.clear()
+        for name, ext, root, template, tiles in sets:
+            self.scan_store.add_set(name, ext, tiles, root, template)
+        self._verify_issues = {tuple(key): issues for *key, issues in meta.get("issues", [])}
+        self._verify_done = True
+        self._duplicates = {tuple(copy): tuple(of) for copy, of in meta.get("duplicates", [])}
+        self._budget_reached = meta.get("partial")
+        self.table_widget.populate_table(self.scan_store.sorted_sets())
+        self.mark_verify_issues()
+        self.table_widget.model().set_duplicates(self._duplicates)
+        if self.scan_store:
+            self.show_table()
+            self.adjust_table_size()
+        loaded = f"Loaded saved scan from {meta.get('saved')}, {len(sets)} sets"
+        if self._budget_reached:
+            mc.utils.info(f"[Snapshot] {loaded}, partial: {self._budget_reached}")
+            self.update_status(f"Partial results: {loaded}")
+        else:
+            self.update_status(loaded)
+
+# === Tile Verification ===
+
+    def mark_verify_issues(self):
+        """Highlight names of sets with mismatched or bad tiles."""
+        self.table_widget.model().set_issues(self._verify_issues)
+
+
+    def confirm_verified(self, data: list) -> bool:
+        """Ask before importing while tiles are still being
+        verified, or if selected sets have tile issues."""
+        if self._search_thread and not self._verify_done:
+            answer = QtWidgets.QMessageBox.question(
+                self, "Verification running",
+                "Tiles are still being verified.\n\nImport anyway?")
+            return answer == QtWidgets.QMessageBox.Yes
+
+        flagged = [d["Name"] for d in data if d["key"] in self._verify_issues]
+        if not flagged:
+            return True
+        answer = QtWidgets.QMessageBox.question(
+            self, "Tile issues",
+            f"{len(flagged)} selected set(s) have mismatched or unreadable tiles:\n"
+            f"{', '.join(flagged)}\n\nImport anyway?")
+        return answer == QtWidgets.QMessageBox.Yes
+
+
+    def add_duplicates(self, sets: list):
+        """Flag every set in a group of identical sets but the
+        first, which is the one worth importing."""
+        keys = [set_key(*s) for s in sets]
+        for copy in keys[1:]:
+            self._duplicates[copy] = keys[0]
+        self.table_widget.model().set_duplicates(self._duplicates)
+        mc.utils.info(f"[Duplicates] {', '.join(k[3] for k in keys[1:])} same as {keys[0][3]}")
+
+
+    def confirm_duplicates(self, data: list) -> bool:
+        """Ask before importing a set along with its copy."""
+        selected = {d["key"] for d in data}
+        copies = [f"{copy[0]} = {of[0]}" for copy, of in self._duplicates.items()
+                  if copy in selected and of in selected]
+        if not copies:
+            return True
+        answer = QtWidgets.QMessageBox.question(
+            self, "Duplicate sets",
+            f"{len(copies)} selected set(s) have the same content as another selected set:\n"
+            f"{', '.join(copies)}\n\nImport anyway?")
+        return answer == QtWidgets.QMessageBox.Yes
+
+
+    def confirm_cost(self, data: list) -> bool:
+        """Estimate what the batch will take, refuse it over
+        IMPORT_MAX_GB and ask over IMPORT_WARN_GB."""
+        batch = estimate_batch(data, self.import_throughput)
+        mc.utils.info(f"[ImportCost] {batch.summary()}")
+        self.update_status(f"Importing {batch.summary()}")
+        largest = "\n".join(f"  {s.name} ({s.ext}): {format_bytes(s.memory)}"
+                            for s in batch.largest())
+        gb = batch.memory / 1024 ** 3
+
+        if IMPORT_MAX_GB and gb > IMPORT_MAX_GB:
+            QtWidgets.QMessageBox.warning(
+                self, "Import too large",
+                f"{batch.summary()}.\n\nThis is over the {IMPORT_MAX_GB} GB limit, "
+                f"select fewer sets or a lower depth.\n\nLargest sets:\n{largest}")
+            self.update_status(f"Import over {IMPORT_MAX_GB} GB limit")
+            return False
+        if IMPORT_WARN_GB and gb > IMPORT_WARN_GB:
+            answer = QtWidgets.QMessageBox.question(
+                self, "Large import",
+                f"{batch.summary()}.\n\nLargest sets:\n{largest}\n\nImport anyway?")
+            return answer == QtWidgets.QMessageBox.Yes
+        return True
+
 # === Import Images to Nodes ===
 
     @Slot()
     def import_btn_selected(self):
         self.import_btn.disable_button()
 
-        if self._data_source == None:
+        if not self.scan_store:
             self.update_status("No data loaded or selected")
         
         data = self.get_selected_data()
 
-        if self.data_loaded(data):
-            self.get_or_set_attr("_import_num")
-
-            backdrop = Backdrop(data, self._import_num)
-            if backdrop.num == 2:
-                backdrop.backdrop2 = True
-                backdrop2 = Backdrop(data, self._import_num, 2)
-            
-            for node_num, image_info in enumerate(data):
-                try:
-                    paint_node = PaintNode(image_info)
-                    adjust_y_axis_attr(paint_node, node_num, paint_node.h)
-                    
-                    if image_info["Broadcaster"]:
-                        bcaster = BroadcasterNode(paint_node)
-                        adjust_y_axis_attr(bcaster, node_num, paint_node.h)
-                        backdrop.nodes_with_broadcaster.append(paint_node)
-                        backdrop.nodes_with_broadcaster.append(bcaster)
-                    else:
-                        backdrop.nodes_without_broadcaster.append(paint_node)
-                        
-                    if backdrop.backdrop2:
-                        backdrop.set_backdrop_postion_and_size(backdrop.nodes_with_broadcaster)
-                        backdrop2.set_backdrop_postion_and_size(backdrop.nodes_without_broadcaster)
-                    else:
-                        node_lists_combined = backdrop.nodes_with_broadcaster + backdrop.nodes_without_broadcaster
-                        backdrop.set_backdrop_postion_and_size(node_lists_combined)     
-                    
-                    paint_node.import_images_to_node()
-                except Exception as e:
-                    mari.utils.warn(e)
-                    self.update_status(str(e))
+        proxy = self.proxy_checkbox.isChecked()
+        if (self.data_loaded(data) and self.confirm_verified(data)
+                and self.confirm_duplicates(data)
+                and self.confirm_cost(self.planned_rows(data, proxy))):
+            # Proxies first, conversion skips the sets they replace.
+            self._import_data = data
+            self._import_proxy = proxy
+            self._import_steps = []
+            if proxy:
+                self._import_steps.append((self.proxy_request, self.apply_proxies))
+            if self.convert_checkbox.isChecked():
+                self._import_steps.append((self.convert_request, self.apply_conversions))
+            self.next_import_step()
+            return
         
         self.import_btn.enable_button()
 
+
+    def next_import_step(self):
+        """Start the next proxy or convert request on a
+        TileThread, import once none are left."""
+        data = self._import_data
+        while self._import_steps:
+            make_request, apply = self._import_steps.pop(0)
+            request = make_request(data)
+            if request:
+                self.start_tile_thread(*request, apply)
+                return
+
+        self._import_data = None
+        # Checked up front assuming proxies, sets that didn't get one
+        # import at full res so the batch is checked again.
+        unproxied = [row for row in data
+                     if "full" not in row and proxy_table_size(row["Size"], PROXY_RES)]
+        if not (self._import_proxy and unproxied) or self.confirm_cost(data):
+            self.get_or_set_attr("_import_num")
+            self.execute_import(data)
+        self.import_btn.enable_button()
+
+
+    def planned_rows(self, data: list, proxy: bool) -> list:
+        """Rows as they will be imported, for confirm_cost ahead
+        of any tile work. Proxied sets are at their proxy size,
+        converted tiles already match their node so cost the same."""
+        if not proxy:
+            return data
+        planned = []
+        for row in data:
+            size = proxy_table_size(row["Size"], PROXY_RES)
+            planned.append(dict(row, Size=size) if size else row)
+        return planned
+
+
+    def start_tile_thread(self, payload: dict, status: str, apply):
+        """Run a proxy or convert request, apply(data, records)
+        is called with its records when it finishes."""
+        if self._search_thread and not self._search_thread.watch:
+            self.update_status("Scan running, importing tiles as they are")
+            self.next_import_step()
+            return
+        self.update_status(status)
+        self._progress = {}
+        self._import_apply = apply
+        thread = TileThread(self.search_worker, payload, self)
+        thread.record_received.connect(self.tile_record)
+        thread.tiles_done.connect(self.tiles_finished)
+        self._tile_thread = thread
+        self.cancel_btn.show()
+        thread.start()
+
+
+    @Slot(object)
+    def tile_record(self, record: dict):
+        """Progress and logs from a proxy or convert request."""
+        if record.get("type") == "progress":
+            self.show_progress(record)
+        elif record.get("type") == "log":
+            self.handle_log_record(record["flag"], record["msg"])
+
+
+    @Slot(str)
+    def tiles_finished(self, error: str):
+        """Tile thread has exited, apply its records and move
+        on, or drop the import if it was cancelled."""
+        thread = self._tile_thread
+        self._tile_thread = None
+        if not self._search_thread:
+            self.cancel_btn.hide()
+
+        if thread.cancelled:
+            self._import_data = None
+            self._import_steps = []
+            self.update_status("Import cancelled")
+            self.import_btn.enable_button()
+            return
+        if error:
+            cmd = thread.payload["cmd"]
+            mari.utils.warn(f"[WorkerError] {cmd} failed: {error}")
+            self.update_status(f"{cmd.capitalize()} failed, importing tiles as they are")
+        else:
+            self._import_apply(self._import_data, thread.records)
+        self.next_import_step()
+
+
+    def execute_import(self, data: list):
+        """Create nodes, lay out the whole batch once, then
+        import images. Each node is positioned a single time.
+        Tiles are read ahead in the background so upcoming sets
+        are in the page cache by the time Mari imports them."""
+        prefetcher = TilePrefetcher(PREFETCH_WORKERS, PREFETCH_BUDGET_MB * 1024 ** 2)
+        for i, image_info in enumerate(data):
+            prefetcher.submit(i, image_info["files"])
+        try:
+            created = self.import_sets(data, prefetcher)
+        finally:
+            prefetcher.close()
+        mc.utils.info(f"[Prefetch] {prefetcher.summary()}")
+
+        self._proxy_nodes += [(paint_node, data[i]["full"])
+                              for i, paint_node, _ in created if "full" in data[i]]
+        if self._proxy_nodes:
+            self.upgrade_btn.show()
+
+
+    def proxy_request(self, data: list) -> tuple:
+        """Worker request for proxies of sets larger than
+        PROXY_RES, None if there are none."""
+        large = [d for d in data if proxy_table_size(d["Size"], PROXY_RES)]
+        if not large:
+            return None
+        return ({"cmd": "proxy", "res": PROXY_RES, "bits": PROXY_BITS,
+                 "sets": [{**key_fields(d["key"]), "res": d["Size"], "files": d["files"]}
+                          for d in large]},
+                f"Building proxies for {len(large)} sets...")
+
+
+    def apply_proxies(self, data: list, records: list):
+        """Swap sets for the proxy tiles the worker built, the
+        full res row is kept in 'full' for upgrade_to_full_res.
+        Sets without proxies import at full res. Nodes keep the
+        chosen depth so upgrading only needs a resize."""
+        proxies = {record_key(r): r for r in records if r["type"] == "proxy" and r["proxy"]}
+        for row in data:
+            proxy = proxies.get(row["key"])
+            if proxy:
+                row["full"] = dict(row)
+                row.update({"Size": proxy["res"], "template": proxy["proxy"],
+                            "files": proxy["files"]})
+        requested = sum(1 for r in records if r["type"] == "proxy")
+        mc.utils.info(f"[Proxy] {len(proxies)}/{requested} sets at {PROXY_RES}")
+
+
+    def convert_request(self, data: list) -> tuple:
+        """Worker request converting tiles to their node size
+        and depth, proxy sets are left alone."""
+        sets = [d for d in data if "full" not in d and parse_size(d["Size"])]
+        if not sets:
+            return None
+        return ({"cmd": "convert",
+                 "sets": [{**key_fields(d["key"]), "size": d["Size"],
+                           "bits": int(d["Depth"].split("-")[0]), "files": d["files"]}
+                          for d in sets]},
+                f"Converting tiles for {len(sets)} sets...")
+
+
+    def apply_conversions(self, data: list, records: list):
+        """Point sets at tiles the worker converted, so Mari
+        imports them without resampling."""
+        converted = {record_key(r): r for r in records if r["type"] == "converted"}
+        for row in data:
+            record = None if "full" in row else converted.get(row["key"])
+            if record:
+                row.update({"template": record["converted"], "files": record["files"]})
+        for record in records:
+            if record["type"] == "convert_done":
+                summary = (f"{record['converted']} tiles converted, {record['reused']} reused, "
+                           f"about {format_seconds(record['saved_s'])} saved")
+                mc.utils.info(f"[Convert] {summary} ({record['work_s']}s of work "
+                              f"in {record['wall_s']}s)")
+                self.update_status(summary)
+
+
+    @Slot()
+    def upgrade_to_full_res(self):
+        """Re-import original tiles into nodes imported as
+        proxies, resizing them to the full resolution."""
+        if not self._proxy_nodes or not self.confirm_cost(
+                [full for _, full in self._proxy_nodes]):
+            return
+        self.upgrade_btn.disable_button()
+        remaining = []
+        for paint_node, full in self._proxy_nodes:
+            try:
+                paint_node.upgrade(full)
+            except Exception as e:
+                mari.utils.warn(f"Upgrading '{paint_node.name}' failed: {e}")
+                remaining.append((paint_node, full))
+        upgraded = len(self._proxy_nodes) - len(remaining)
+        self._proxy_nodes = remaining
+        self.update_status(f"Upgraded {upgraded} nodes to full res")
+        self.upgrade_btn.enable_button()
+        if not remaining:
+            self.upgrade_btn.hide()
+
+
+    def import_sets(self, data: list, prefetcher: TilePrefetcher):
+        created = []
+        for i, image_info in enumerate(data):
+            try:
+                paint_node = PaintNode(image_info)
+                bcaster = None
+                if image_info["Broadcaster"]:
+                    bcaster = BroadcasterNode(paint_node)
+                created.append((i, paint_node, bcaster))
+            except Exception as e:
+                prefetcher.finish_import(i)
+                mari.utils.warn(e)
+                self.update_status(str(e))
+
+        if not created:
+            return created
+
+        plan = plan_import([
+            {"broadcaster": bcaster is not None,
+             "paint_size": (paint_node.w, paint_node.h),
+             "broadcaster_size": (bcaster.w, bcaster.h) if bcaster else None}
+            for _, paint_node, bcaster in created])
+
+        for (_, paint_node, bcaster), layout in zip(created, plan.sets):
+            paint_node.place(layout.paint)
+            if bcaster:
+                bcaster.place(layout.broadcaster)
+
+        for layout in plan.backdrops:
+            try:
+                Backdrop(self._import_num).create(layout)
+            except Exception as e:
+                mc.utils.info(f"Skipping: {e}")
+
+        for i, paint_node, _ in created:
+            prefetcher.start_import(i)
+            start = time.perf_counter()
+            try:
+                paint_node.import_images_to_node()
+                self.import_throughput = update_throughput(
+                    THROUGHPUT_FILE, self.import_throughput,
+                    paint_bytes(paint_node.size, paint_node.depth, len(paint_node.source_files)),
+                    time.perf_counter() - start)
+            except Exception as e:
+                mari.utils.warn(e)
+                self.update_status(str(e))
+            finally:
+                prefetcher.finish_import(i)
+        self.table_widget.model().set_throughput(self.import_throughput)
+        return created
+
     
     def get_or_set_attr(self, attr):
         """Set 1 if not exists, increment by 1 if exists"""
@@ -444,196 +1561,96 @@ class MainWindow(QtWidgets.QWidget):
 
 # === Data Config / Cleaning ===
 
-    def return_search_path(self):
-        """Input handling for text entered into search box."""
+    def return_search_paths(self):
+        """Input handling for text entered into search box,
+        returns the valid roots or None if there are none."""
         try:
-            input_path = self.path_input_box.text()
-            path = Path(input_path.strip())
-            mc.utils.info(f"Checking: {str(path)}")
-            if path.exists() and path != Path("."):
-                mc.utils.info(f"Valid path: {str(path)}")
-                self._input_path = str(path)
-                return str(path)
-            else:
-                raise Exception(f"Path '{input_path}' invalid")
+            valid = []
+            for input_path in self.current_roots():
+                path = Path(input_path)
+                mc.utils.info(f"Checking: {str(path)}")
+                if path.exists() and path != Path("."):
+                    mc.utils.info(f"Valid path: {str(path)}")
+                    valid.append(str(path))
+                else:
+                    mc.utils.warn(f"[ERROR] Path '{input_path}' invalid, skipping")
+            if not valid:
+                raise Exception(f"Path '{self.path_input_box.text()}' invalid")
+            self._input_path = valid[0]
+            return valid
         except Exception as e:
             mc.utils.warn("[ERROR]", e)
             self.update_status(str(e))
             return None
 
 
-    def configure_table_info(self, image_info: dict=None) -> list:
-        """Dictonary formatted for displaying in GUI."""
-        if not image_info:
-            return
-
-        entries = []
-        for image_name, file_types in image_info.items():
-            for etype, dict_list in file_types.items():
-                for i in dict_list:
-                    colourspace = "scalar" if i.get("channels", 0) == 1 else "color"
-                    entries.append({
-                        "Name": image_name,
-                        "File Type": etype.upper(),
-                        "Udim Count": len(dict_list),
-                        "Size": i.get("res"),
-                        "Depth": f"{i.get('bitdepth')}-bit",
-                        "Colourspace": colourspace
-                        })
-                    break 
-        return entries
-
-
     def get_selected_data(self):
         """Returns data from selected rows in GUI."""
         all_row_data = []
+        model = self.table_widget.model()
 
-        for row_num in range(self.table_widget.rowCount()):
-            row_data = {}
-            for col_num in range(1, self.table_widget.columnCount()):
-                header = self.table_widget.horizontalHeaderItem(col_num).text()
-                checkbox = self.table_widget.item(row_num, 0)
-                
-                if checkbox.checkState() == Qt.Checked:
-                    table_item = self.table_widget.item(row_num, col_num)
-                    widget_item = self.table_widget.cellWidget(row_num, col_num)
-                    
-                    if widget_item is not None:
-                        if isinstance(widget_item, QtWidgets.QCheckBox):
-                            row_data[header] = widget_item.isChecked()
-                        else:
-                            row_data[header] = widget_item.currentText()
-                    else:
-                        row_data[header] = table_item.text()
-            
-            if row_data:
-                paths = self.get_selected_image_paths(str(row_data["Name"]))
-                row_data["files"] = paths
-                all_row_data.append(row_data)
-
-                
-        all_row_data = self.get_indexes_for_node_placement(all_row_data)
-        return all_row_data
+        for row_num in range(model.rowCount()):
+            if model.is_checked(row_num, 0):
+                all_row_data.append(model.row_data(row_num))
+
+        all_row_data = import_rows(self.scan_store, all_row_data)
+        return self.get_indexes_for_node_placement(all_row_data)
     
 
     def get_indexes_for_node_placement(self, data: list):
         """Append different indexes for placement on seperate
         backdrops, depending on if node has broadcaster or not."""
-        paint_nodes_w_broadcasters = [d for d in data if d["Broadcaster"]]
-        for num, node in enumerate(paint_nodes_w_broadcasters):
-            node["paint_node_indx"] = 0
-            node["index"] = num
-
-        paint_nodes = [d for d in data if not d["Broadcaster"]]
-        for num, node in enumerate(paint_nodes):
-            node["paint_node_indx"] = num
-            node["index"] = 0
+        entries = [{"broadcaster": d["Broadcaster"]} for d in data]
+        for node, (paint_index, index) in zip(data, placement_indexes(entries)):
+            node["paint_node_indx"] = paint_index
+            node["index"] = index
         return data
     
 
     def select_all_broadcaster(self):
         """Select all checkboxes, uncheck if
         all boxes selected."""
-        table = self.table_widget
-        row_count = table.rowCount()
-        check_all = self.check_checkstate(7)
-        for row in range(row_count):
-            checkbox = table.cellWidget(row, 7)
-            if check_all:
-                checkbox.setChecked(True)
-            else:
-                checkbox.setChecked(False)
+        column = self.table_widget.columnCount() - 1
+        check_all = self.check_checkstate(column)
+        self.table_widget.model().set_column_checked(column, check_all)
 
 
     def select_all_checkboxes(self):
         """Select all checkboxes if button clicked. 
         Uncheck if all boxes checked."""
-        table = self.table_widget
-        row_count = table.rowCount()
         check_all = self.check_checkstate(0)
-        for row in range(row_count):
-            checkbox = table.item(row, 0)
-            if check_all:
-                checkbox.setCheckState(Qt.Checked)
-            else:
-                checkbox.setCheckState(Qt.Unchecked)
+        self.table_widget.model().set_column_checked(0, check_all)
 
 
     def check_checkstate(self, column: int) -> bool:
         """Check all boxes if any boxes are unchecked."""
-        table = self.table_widget
-        row_count = table.rowCount()
-        unchecked = 0
-        for row in range(row_count):
-            if column == 0:
-                checkbox = table.item(row, column)
-                unchecked += 1 if checkbox.checkState() == Qt.Unchecked else 0
-            elif column ==  7:
-                checkbox = table.cellWidget(row, column)
-                unchecked += 1 if not checkbox.isChecked() else 0
-        return True if unchecked != 0 else False
-    
-
-    def get_selected_image_paths(self, name):
-        """Add list of file paths to each selected row."""
-        main_file_dict = self.data_dict
-        filepaths = []
-        for filename, data_dict in main_file_dict.items():
-            if name == filename:
-                for ext, data_list in data_dict.items():
-                    for d in data_list:
-                        filepaths.append(d["path"])
-        return filepaths
-    
-
-    def read_data(self):
-        """Read json created by image search for results."""
-        try:
-            json_file = self._data_source
-            with open(json_file, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                mc.utils.info(f"JSON file loaded: {json_file}")
-                msg = f"Source: {self._input_path}"
-                self.update_status(msg)
-                return data
-            
-        except json.JSONDecodeError as e:
-            mc.utils.info(f"Loading data error: {e}")
-            return None
+        model = self.table_widget.model()
+        return any(not model.is_checked(row, column)
+                   for row in range(model.rowCount()))
     
 
     def closeEvent(self, event):
         """Close application event."""
-        self.clean_up_data()
+        for thread in (self._search_thread, self._tile_thread):
+            if thread:
+                thread.cancel()
+                thread.wait()
         super().closeEvent(event)
 
-    
-    def clean_up_data(self):
-        """Deletes current data source saved in
-        temp files."""
-        if hasattr(self, "_data_source") and self._data_source:
-            path = Path(self._data_source)
-            if path.exists():
-                try:
-                    path.unlink()
-                    mc.utils.info(f"[CLEAN] Deleted: {path}")
-                except Exception as e:
-                    mc.utils.info(f"[ERROR] Failed to delete path: {path} {e}")
-
 # === Mari Classes ===
 
 class PaintNode:
     def __init__(self, selected_data: dict):
         data = selected_data
         self.data = data
-        self.name = dict_value(data, 0)
-        self.size = dict_value(data, 3)
-        self.depth = dict_value(data, 4)
-        self.space = dict_value(data, 5)
-        self.broadcaster_value = dict_value(data, 6)
-        self.source_files = dict_value(data, 7)
-        self.paint_index = dict_value(data, 8)
-        self.index = dict_value(data, 9)
+        self.name = data["Name"]
+        self.size = data["Size"]
+        self.depth = data["Depth"]
+        self.space = data["Colourspace"]
+        self.broadcaster_value = data["Broadcaster"]
+        self.source_files = data["files"]
+        self.paint_index = data["paint_node_indx"]
+        self.index = data["index"]
 
         paint_node = self.create_paint_node()
         self.set_colourspace(paint_node)
@@ -641,10 +1658,15 @@ class PaintNode:
         qsize = get_node_size(paint_node)
         self.w = qsize.width()
         self.h = qsize.height()
-        self.x = 0 if self.broadcaster_value else -400
 
         self.qsize = qsize
         self.node = paint_node
+
+
+    def place(self, layout):
+        """Move node to its planned position."""
+        self.x, self.y = layout.x, layout.y
+        set_node_position(self.node, QPointF(layout.x, layout.y))
         
 
     def create_paint_node(self) -> object:
@@ -652,7 +1674,7 @@ class PaintNode:
         using attributes from target import image set."""
         try:
             node_graph = mari.geo.current().nodeGraph()
-            x, y = self.size.split("x")
+            x, y = paint_node_size(self.size)
             depth = self.depth.split('-')[0]
             paint_node = node_graph.createPaintNode(
                 int(x), 
@@ -678,18 +1700,27 @@ class PaintNode:
 
     def import_images_to_node(self):
         """Import image set to paint node."""
-        image_template = self.get_template(self.data)
+        image_template = self.data.get("template") or self.get_template(self.data)
         image_set = self.node.imageSet()
         image_set.importImages(image_template, mari.ImageSet.SCALE_THE_PATCH)
 
     
     def get_template(self, data: dict) -> str:
         """Return template for importing imgas to node."""
-        img_path = data["files"][0]
-        f = TXT_REGEX.match(os.path.basename(img_path))
-        name, sep, ext = f.group("name"), f.group("sep"), f.group("ext")
-        template = f"{os.path.dirname(img_path)}/{name}{sep}$UDIM.{ext}"
-        return template  
+        return tile_template(data["files"][0])
+
+
+    def upgrade(self, full: dict):
+        """Swap proxy tiles for the originals in full, images
+        are resized first so the import keeps full detail."""
+        width, _ = paint_node_size(full["Size"])
+        image_set = self.node.imageSet()
+        for image in image_set.imageList():
+            image.resize(width)
+        image_set.importImages(full["template"], mari.ImageSet.SCALE_THE_PATCH)
+        self.data = full
+        self.size = full["Size"]
+        self.source_files = full["files"]
 
 
 class BroadcasterNode:
@@ -703,7 +1734,6 @@ class BroadcasterNode:
         qsize = get_node_size(broadcaster)
         self.w = qsize.width()
         self.h = qsize.height()
-        self.x = target_node.w * 2
 
         self.qsize = qsize
         self.broadcaster_value = True
@@ -738,20 +1768,16 @@ class BroadcasterNode:
         broadcaster.setInputNode("Input", paint_node)
 
 
-class Backdrop:
-    def __init__(self, data:list, import_num, backdrop_num=None):
-        self.backdrop_created = False
-        self.num = self.backdrop_num(data)
-        self.nodes_without_broadcaster = []
-        self.nodes_with_broadcaster = []
-        self.backdrop2 = False
-        self.is_backdrop_2 = True if backdrop_num == 2 else False
-        self.import_num = import_num
+    def place(self, layout):
+        """Move node to its planned position."""
+        self.x, self.y = layout.x, layout.y
+        set_node_position(self.node, QPointF(layout.x, layout.y))
 
 
-    def backdrop_num(self, data):
-        backdrop_amount = set([d["Broadcaster"] for d in data])
-        return len(backdrop_amount)
+class Backdrop:
+    def __init__(self, import_num):
+        self.import_num = import_num
+        self.node = None
 
 
     def create_backdrop(self) -> object:
@@ -766,52 +1792,17 @@ class Backdrop:
         return unique_tag
     
 
-    def set_backdrop_postion_and_size(self, nodes:list):
-        try:
-            left = min(n.x for n in nodes)
-            top = min(n.y for n in nodes)
-            right = max(n.x + n.w for n in nodes) 
-            bottom = max(n.y + n.h for n in nodes)
-
-            XPADDING = 50
-            YPADDING = 50
-            width = XPADDING + (right - left) + XPADDING
-            height = YPADDING + (bottom - top) + YPADDING
-
-            qpointf = QPointF(left - XPADDING, top - YPADDING)
-
-            if not getattr(self, "backdrop_created"):
-                backdrop = self.create_backdrop()
-                unique_tag = self.get_uniq_tag()
-                backdrop.addTag(unique_tag)
-                self.node = backdrop
-                self.backdrop_created = True
-
-            set_node_size(self.node, width, height)
-            set_node_position(self.node, qpointf)
-        except Exception as e:
-            mc.utils.info(f"Skipping: {e}")
+    def create(self, layout):
+        """Create backdrop at its planned position and size."""
+        backdrop = self.create_backdrop()
+        backdrop.addTag(self.get_uniq_tag())
+        set_node_size(backdrop, layout.w, layout.h)
+        set_node_position(backdrop, QPointF(layout.x, layout.y))
+        self.node = backdrop
+        return backdrop
 
 # === Misc Global Helpers ===
 
-def adjust_y_axis_attr(node: object, node_num: int, add_y:float=118):
-    """Set node y positon and then increase each time adjusting postion
-    down the node graph."""
-    if node_num == 0:
-        node.y = 0
-    else:
-        if not node.broadcaster_value:
-            if node.paint_index == 0:
-                node.y = 0
-            else:
-                node.y = (add_y * node.paint_index) * 2
-        else:
-            node.y = (add_y * node.index) * 2
-    
-    qpointf = QPointF(node.x, node.y)
-    set_node_position(node.node, qpointf)
-
-
 def set_node_position(input_node, qpointf):
     input_node.setNodeGraphPosition(qpointf)
 
@@ -835,9 +1826,57 @@ def time_stamp():
     return timestamp
 
 
-def dict_value(data: dict, index: int):
-    value = list(data.values())[index]
-    return value
+def snapshot_path() -> str:
+    """Snapshot file for the open project, None if no project."""
+    project = mari.projects.current()
+    if not project:
+        return None
+    return os.path.join(SNAPSHOT_DIR, f"{project.uuid()}.snap")
+
+
+def split_roots(text: str) -> list:
+    """Roots from the path box, saved roots files are
+    expanded in place."""
+    roots = []
+    for entry in text.split(ROOTS_SEPARATOR):
+        entry = entry.strip()
+        if entry.endswith((".roots", ".txt")) and os.path.isfile(entry):
+            roots.extend(read_roots_file(entry))
+        elif entry:
+            roots.append(entry)
+    return roots
+
+
+def read_roots_file(path: str) -> list:
+    """One root per line, blank lines and # comments skipped."""
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+def write_roots_file(path: str, roots: list):
+    with open(path, "w") as f:
+        f.write("\n".join(roots) + "\n")
+
+
+def make_metrics_log(path: str):
+    """Logger appending to a rotating metrics file, None if
+    no path is set or the file can't be opened."""
+    if not path:
+        return None
+    logger = logging.getLogger("import_textures.metrics")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        try:
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=METRICS_MAX_BYTES, backupCount=METRICS_BACKUPS)
+        except OSError as e:
+            mc.utils.warn(f"[MetricsError] {e}")
+            return None
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+    return logger
 
 
 # === Main Execution ===
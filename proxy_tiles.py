@@ -0,0 +1,82 @@
+# Proxy and pre-converted tiles, resized and re-typed copies made before
+# import so Mari doesn't resample them itself. Copies are stored by the
+# content digest of their source tile, so renamed or copied tiles share
+# one copy and edited tiles get a new one:
+#   <cache>/objects/ab/<digest>_<size>_<bits>.<ext>
+# Mari imports by $UDIM template, so each set also gets a folder of
+# links named after the set pointing at its tiles.
+import os
+import time
+import hashlib
+
+import OpenImageIO as OpenIO
+from import_cost import proxy_size
+
+# Pixel type and file type written per paint node depth, Mari's 16 and
+# 32-bit nodes are half and full float.
+TILE_FORMATS = {8: (OpenIO.UINT8, "tif"),
+                16: (OpenIO.HALF, "exr"),
+                32: (OpenIO.FLOAT, "exr")}
+
+
+def tile_ext(bits: int) -> str:
+    return TILE_FORMATS[bits][1]
+
+
+def object_path(cache_dir: str, digest: str, size, bits: int) -> str:
+    """Cache path for a copy of a tile, size is the proxy
+    res or the 'WxH' converted to."""
+    return os.path.join(cache_dir, "objects", digest[:2],
+                        f"{digest}_{size}_{bits}.{tile_ext(bits)}")
+
+
+def convert_tile(source: str, dest: str, bits: int, width: int=None,
+                 height: int=None, fit: int=None) -> float:
+    """Write source to dest at bits, resized to width x height
+    or to fit within fit. Returns seconds taken. Runs in a
+    pool process, so OIIO is held to one thread here. Raises
+    RuntimeError if OIIO fails."""
+    start = time.perf_counter()
+    buf = OpenIO.ImageBuf(source)
+    spec = buf.spec()
+    if fit:
+        width, height = proxy_size(spec.width, spec.height, fit)
+    if (width, height) != (spec.width, spec.height):
+        roi = OpenIO.ROI(0, width, 0, height, 0, 1, 0, spec.nchannels)
+        buf = OpenIO.ImageBufAlgo.resize(buf, roi=roi, nthreads=1)
+        if buf.has_error:
+            raise RuntimeError(f"Resize failed {source}: {buf.geterror()}")
+
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    tmp_path = f"{dest}.{os.getpid()}.tmp.{tile_ext(bits)}"
+    if not buf.write(tmp_path, TILE_FORMATS[bits][0]):
+        raise RuntimeError(f"Writing {dest} failed: {buf.geterror()}")
+    os.replace(tmp_path, dest)
+    return time.perf_counter() - start
+
+
+def make_proxy(source: str, dest: str, res: int, bits: int) -> float:
+    """Downscaled copy of source, see convert_tile."""
+    return convert_tile(source, dest, bits, fit=res)
+
+
+def link_set(cache_dir: str, name: str, tiles: list, ext: str) -> str:
+    """Folder of links for a set's [(udim, tile path)], returns
+    the $UDIM template to import. The folder is named from
+    the tiles it holds so it is only built once."""
+    key = hashlib.blake2b("".join(f"{u}{p}" for u, p in sorted(tiles)).encode(),
+                          digest_size=8).hexdigest()
+    folder = os.path.join(cache_dir, "sets", key)
+    os.makedirs(folder, exist_ok=True)
+    for udim, path in tiles:
+        link = os.path.join(folder, f"{name}.{udim}.{ext}")
+        if os.path.lexists(link):
+            continue
+        try:
+            os.link(path, link)
+        except FileExistsError:
+            continue
+        except OSError:
+            # Cache on another filesystem or one without hard links.
+            os.symlink(path, link)
+    return os.path.join(folder, f"{name}.$UDIM.{ext}")
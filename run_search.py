@@ -2,164 +2,1188 @@ import sys
 import os
 import re
 import json
-from datetime import datetime
+import time
+import queue
+import socket
+import asyncio
+import argparse
+import threading
+import contextlib
+import contextvars
+from itertools import islice
+from functools import partial
+from operator import attrgetter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 import OpenImageIO as OpenIO
-from collections import defaultdict, OrderedDict
+from collections import defaultdict
+from search_cache import MetadataCache
+from scan_metrics import ScanMetrics
+from scan_store import SET_FIELDS, key_fields
+from tree_watch import make_watcher, wait_for_changes
+from tree_crawl import crawl, CRAWL_WORKERS
+from tile_hash import HASH_NAME, hash_file, hash_set
+from proxy_tiles import object_path, proxy_size, tile_ext, make_proxy, convert_tile, link_set
 
 # Regex matches name, udim, extension.
 TXT_REGEX = re.compile(r'^(?P<name>.*?)[^\d](?P<udim>\d{4})\.(?P<ext>\w+)$')
 TARGET_FILETYPES = {"tif", "exr", "txt", "jpeg", "jpg"}
 OUTDIR = "/path/to/temp/file/folder"
+TILE_KEYS = ("udim", "path", "res", "bitdepth", "channels")
+CACHE_PATH = f"{OUTDIR}/img_search_cache.sqlite"
 
+# Header probing concurrency. OIIO releases the GIL while reading, so
+# threads overlap file latency; the count is tuned from a serial sample.
+# Each worker has at most PROBES_IN_FLIGHT probes queued.
+PROBE_SAMPLE_SIZE = 4
+MIN_PROBE_WORKERS = 2
+MAX_PROBE_WORKERS = 32
+LOCAL_PROBE_SECONDS = 0.002
+PROGRESS_EVERY = 200
+PROBES_IN_FLIGHT = 8
+CACHED_KEYS = ("res", "bitdepth", "channels", "complete")
 
-def log(msg): print(msg, flush=True)
+# File name matching runs in CLASSIFY_PROCESSES processes when set, only
+# worth it on very large trees. Folders are sent in batches of about
+# CLASSIFY_BATCH files. Walk order is sorted unless CRAWL_ORDERED is off.
+CLASSIFY_PROCESSES = 0
+CLASSIFY_BATCH = 2000
+CRAWL_ORDERED = True
 
+# Content hashing reads whole tiles, HASH_WORKERS files at once.
+HASH_WORKERS = 4
 
-def valid_file_num(path: str=None) -> bool:
-    """Returns false for max files, no files."""
-    MAX_FILES = 3200
-    count = 0
-    for _,_, files in os.walk(path):
-        for file in files:
-            count += 1
-            if count >= MAX_FILES:
-                log(f"[FileCount] {count}")
-                log(f"[MaxFileError] '{count}' files found, aborting image search.")
-                return False
-    if count == 0:
-        log(f"[ZeroFileError] '{count}' image files found in {path}")
-        return False
+# Proxy tiles fit the longest side to PROXY_RES at PROXY_BITS, made in
+# PROXY_PROCESSES processes and kept in PROXY_DIR, see proxy_tiles.
+PROXY_DIR = f"{OUTDIR}/proxies"
+PROXY_RES = 1024
+PROXY_BITS = 8
+PROXY_PROCESSES = max((os.cpu_count() or 2) // 2, 1)
+
+# Tiles not matching their paint node's size and depth are converted
+# ahead of import in CONVERT_PROCESSES processes, kept in CONVERT_DIR.
+CONVERT_DIR = f"{OUTDIR}/converted"
+CONVERT_PROCESSES = os.cpu_count() or 2
+
+# Scan budgets, a scan stops at whichever is hit first and keeps the
+# sets found so far. FILE_BUDGET also bounds memory. None is unlimited.
+FILE_BUDGET = 200000
+TIME_BUDGET = None
+
+# Warm worker, exits after WORKER_IDLE_TIMEOUT seconds without a request.
+WORKER_IDLE_TIMEOUT = 1800
+
+# Watch mode wakes every WATCH_HEARTBEAT seconds to check it is still
+# wanted, so it doesn't outlive the GUI or consumer that started it.
+WATCH_HEARTBEAT = 1.0
+
+# Library scans buffer at most SCAN_QUEUE_SIZE records before waiting
+# on the consumer, and check for cancellation every CANCEL_POLL_SECONDS.
+SCAN_QUEUE_SIZE = 256
+CANCEL_POLL_SECONDS = 0.1
+
+
+_emit_lock = threading.Lock()
+_record_sink = contextvars.ContextVar("record_sink", default=None)
+# Each scan counts into its own ScanMetrics, work outside a scan into
+# the shared default.
+_scan_metrics = contextvars.ContextVar("scan_metrics", default=ScanMetrics())
+_SCAN_END = object()
+
+
+def current_metrics() -> ScanMetrics:
+    return _scan_metrics.get()
+
+
+class ScanCancelled(Exception):
+    """Raised inside a library scan once its consumer has gone."""
+
+
+def emit(record: dict):
+    """Write one protocol record as a line of JSON. Records
+    are typed: log, progress, set, removed, verify,
+    verify_done, duplicates, proxy, converted, convert_done,
+    metrics, pong and worker_done. Inside a
+    library scan records go to its consumer instead."""
+    start = time.perf_counter()
+    sink = _record_sink.get()
+    if sink:
+        sink(record)
     else:
-        log(f"[FileCount] {count}")
-        return True
-    
-    
+        write_record(record)
+    current_metrics().add_time("emit", time.perf_counter() - start)
+    current_metrics().count("records")
+
+
+def write_record(record: dict):
+    line = json.dumps(record) + "\n"
+    with _emit_lock:
+        sys.stdout.write(line)
+        sys.stdout.flush()
+
+
+def log(msg):
+    """Emit '[Flag] message' as a log record."""
+    flag, _, text = msg.partition("] ")
+    emit({"type": "log", "flag": flag.lstrip("["), "msg": text})
+
+
+class ScanBudget:
+    """File and time limits for one scan, logs a
+    BudgetReached warning the first time one is hit."""
+    def __init__(self, max_files: int=FILE_BUDGET, max_seconds: float=TIME_BUDGET):
+        self.max_files = max_files
+        self.max_seconds = max_seconds
+        self.start = time.monotonic()
+        self.reached = None
+
+
+    def over_files(self, files: int) -> bool:
+        if self.max_files and files >= self.max_files:
+            self.stop(f"file budget of {self.max_files} files")
+            return True
+        return False
+
+
+    def over_time(self) -> bool:
+        if self.max_seconds and time.monotonic() - self.start >= self.max_seconds:
+            self.stop(f"time budget of {self.max_seconds}s")
+            return True
+        return False
+
+
+    def stop(self, reason: str):
+        if not self.reached:
+            self.reached = reason
+            log(f"[BudgetReached] Stopped at the {reason}, results are partial.")
+
+
+class ScanTile:
+    """One udim tile found by a scan. Slotted, with name, ext
+    and folder interned, as a scan can hold hundreds of
+    thousands. The same record goes from the walk through
+    probing into organised, only header metadata is added."""
+    __slots__ = ("name", "ext", "udim", "folder", "file", "root",
+                 "res", "bitdepth", "channels", "complete")
+
+    def __init__(self, name: str, ext: str, udim: str, folder: str, file: str,
+                 root: str=None):
+        self.name = sys.intern(name)
+        self.ext = sys.intern(ext)
+        self.udim = udim
+        self.folder = sys.intern(folder)
+        self.file = file
+        self.root = root
+        self.res = None
+        self.bitdepth = None
+        self.channels = None
+        self.complete = None
+
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.folder, self.file)
+
+
+    @property
+    def template(self) -> str:
+        """$UDIM template of the tile's set, as scan_store.tile_template."""
+        return f"{self.folder}/{self.file[:len(self.name) + 1]}$UDIM.{self.ext}"
+
+
+    def set_key(self) -> tuple:
+        """(name, ext, root, template) of the set the tile belongs to."""
+        return (self.name, self.ext, self.root or "", self.template)
+
+
+    def update(self, metadata: dict):
+        """Take probed or cached header metadata."""
+        for key in CACHED_KEYS:
+            if key in metadata:
+                value = metadata[key]
+                setattr(self, key, sys.intern(value) if isinstance(value, str) else value)
+
+
+    def record(self) -> dict:
+        """Tile as sent in set records."""
+        return {key: getattr(self, key) for key in TILE_KEYS}
+
+
+def skip_folder(dirpath: str, error: OSError):
+    log(f"[DEBUG] Skipping unreadable folder {dirpath}: {error}")
+
+
+def walk_folders(path: str, workers: int=CRAWL_WORKERS):
+    """Yield (dirpath, file names) for every folder below path.
+    Sibling folders are listed in parallel, see tree_crawl."""
+    return crawl(path, workers, CRAWL_ORDERED, skip_folder)
+
+
+def walk_files(path: str):
+    """Yield (dirpath, filename) for every file below path."""
+    for dirpath, names in walk_folders(path):
+        for name in names:
+            yield dirpath, name
+
+
 def user_input_handling(input_path: str=None) -> bool:
     if not input_path:
         log("[InvalidPathError] Input is equating to None.")
         return False
     
-    if valid_file_num(input_path):
+    if os.path.isdir(input_path):
         log(f"[ValidPath] Input path valid {input_path}")
         return True
     else:
+        log(f"[InvalidPathError] Input is not a folder {input_path}")
         return False
     
 
-def get_metadata(image_list: list) -> list:
-    """Collects key image information appends to dict
-    then returns list."""
-    for image_dict in image_list:
-        file_path = image_dict.get("path")
-        if os.path.exists(file_path):
-            image_obj = OpenIO.ImageInput.open(file_path)
-            if not image_obj:
-                log(f"[MetadataError] ImageIO failed to open image: {file_path}")
-                continue
-            try:
-                spec = image_obj.spec()
-                image_dict["res"] = f"{spec.width}x{spec.height}"
-                if hasattr(spec, "extra_attribs") and spec.extra_attribs:
-                    image_dict["bitdepth"] = spec.extra_attribs[0].value
-                image_dict["channels"] = getattr(spec, "nchannels", None)
-            except Exception as e:
-                log(f"[MetadataError] Exception raised while reading image {e}")
-            finally:
-                if image_obj:
-                    image_obj.close()
-        else:
-            log(f"[ImageFileNotFoundError] {file_path}")
+def resolve_roots(paths) -> list:
+    """Valid roots in the order given. Repeats and roots inside
+    another root are dropped so no folder is walked twice."""
+    if isinstance(paths, str) or paths is None:
+        paths = [paths]
+    roots = []
+    real_roots = []
+    for path in paths:
+        if not user_input_handling(path):
+            continue
+        real = os.path.realpath(path)
+        if any(real == r or real.startswith(r.rstrip(os.sep) + os.sep) for r in real_roots):
+            log(f"[DEBUG] Skipping {path}, already inside a root.")
+            continue
+        # A later root may contain earlier ones.
+        nested = [i for i, r in enumerate(real_roots)
+                  if r.startswith(real.rstrip(os.sep) + os.sep)]
+        for i in reversed(nested):
+            log(f"[DEBUG] Skipping {roots[i]}, inside {path}.")
+            del roots[i], real_roots[i]
+        roots.append(path)
+        real_roots.append(real)
+    return roots
+
+
+def root_of(path: str, roots: list) -> str:
+    """Root a path was found under."""
+    for root in roots:
+        if path.startswith(root.rstrip(os.sep) + os.sep):
+            return root
+    return None
+
+
+def read_last_block(image_obj, spec) -> bool:
+    """Read final scanline or tile, False if the pixel
+    data is truncated or unreadable."""
+    if spec.tile_width:
+        x = spec.x + ((spec.width - 1) // spec.tile_width) * spec.tile_width
+        y = spec.y + ((spec.height - 1) // spec.tile_height) * spec.tile_height
+        pixels = image_obj.read_tile(x, y, spec.z, OpenIO.UINT8)
+    else:
+        pixels = image_obj.read_scanline(spec.y + spec.height - 1, spec.z, OpenIO.UINT8)
+    return pixels is not None
+
+
+def probe_file(file_path: str, check_tail: bool=False) -> dict:
+    """Open a single image header, returns dict of res,
+    bitdepth and channels. Empty dict if unreadable.
+    check_tail also reads the last block of pixels and
+    records it under 'complete'."""
+    start = time.perf_counter()
+    try:
+        metadata = read_metadata(file_path, check_tail)
+    finally:
+        current_metrics().probe_latency(time.perf_counter() - start)
+    current_metrics().count("probed")
+    if "res" not in metadata:
+        current_metrics().count("probe_failed")
+    return metadata
+
+
+def read_metadata(file_path: str, check_tail: bool=False) -> dict:
+    """Untimed header read, see probe_file."""
+    metadata = {}
+    if not os.path.exists(file_path):
+        log(f"[ImageFileNotFoundError] {file_path}")
+        return metadata
+
+    image_obj = OpenIO.ImageInput.open(file_path)
+    if not image_obj:
+        log(f"[MetadataError] ImageIO failed to open image: {file_path}")
+        return metadata
+    try:
+        spec = image_obj.spec()
+        metadata["res"] = f"{spec.width}x{spec.height}"
+        if hasattr(spec, "extra_attribs") and spec.extra_attribs:
+            metadata["bitdepth"] = spec.extra_attribs[0].value
+        metadata["channels"] = getattr(spec, "nchannels", None)
+        if check_tail:
+            metadata["complete"] = read_last_block(image_obj, spec)
+    except Exception as e:
+        log(f"[MetadataError] Exception raised while reading image {e}")
+        if check_tail:
+            metadata["complete"] = False
+    finally:
+        image_obj.close()
+    return metadata
+
+
+def tune_worker_count(latency: float) -> int:
+    """Scale worker count with per-file latency, local disks
+    stay near the minimum, network mounts fan out."""
+    if latency <= LOCAL_PROBE_SECONDS:
+        return MIN_PROBE_WORKERS
+    workers = int(latency / LOCAL_PROBE_SECONDS) * MIN_PROBE_WORKERS
+    return max(MIN_PROBE_WORKERS, min(MAX_PROBE_WORKERS, workers))
+
+
+def cache_failed(error: Exception):
+    log(f"[CacheError] Metadata cache dropped, continuing without it {error}")
+
+
+def open_cache(db_path: str=None):
+    """Returns metadata cache, None if it can't be opened."""
+    try:
+        return MetadataCache(db_path or CACHE_PATH, on_error=cache_failed)
+    except Exception as e:
+        log(f"[CacheError] Metadata cache unavailable {e}")
+        return None
+
+
+def iter_metadata(image_list: list, workers: int=None, cache=None,
+                  check_tail: bool=False):
+    """Fill key image information into each ScanTile, yielding
+    tiles as they complete. Cache hits come first, then probes
+    in completion order. Headers are probed concurrently."""
+    total = len(image_list)
+    done = 0
+    misses = [(tile, tile.path, None) for tile in image_list]
+    if cache:
+        # Stat calls are all latency on network mounts, fan them out.
+        with ThreadPoolExecutor(max_workers=workers or MAX_PROBE_WORKERS) as executor:
+            keys = executor.map(cache.file_key, [tile.path for tile in image_list])
+            misses = [(tile, tile.path, key) for tile, key in zip(image_list, keys)]
+        cached = cache.lookup([key for _, _, key in misses])
+        if check_tail:
+            cached = {p: m for p, m in cached.items() if "complete" in m}
+        log(f"[DEBUG] Cache hits {len(cached)}/{total}")
+        current_metrics().count("cache_hits", len(cached))
+        if cached:
+            hits = [(tile, cached[path]) for tile, path, _ in misses if path in cached]
+            misses = [miss for miss in misses if miss[1] not in cached]
+            for tile, metadata in hits:
+                tile.update(metadata)
+                done += 1
+                yield tile
+
+    probed = []
+    try:
+        if misses and not workers:
+            # Serial sample to measure latency before fanning out.
+            sample = misses[:PROBE_SAMPLE_SIZE]
+            start_time = time.perf_counter()
+            for tile, path, key in sample:
+                metadata = probe_file(path, check_tail)
+                tile.update(metadata)
+                probed.append((key, metadata))
+                done += 1
+                yield tile
+            latency = (time.perf_counter() - start_time) / len(sample)
+            workers = tune_worker_count(latency)
+            log(f"[DEBUG] Probe latency {latency * 1000:.2f}ms, workers {workers}")
+
+        remaining = iter(misses[len(probed):])
+        if len(misses) > len(probed):
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                probe = partial(probe_file, check_tail=check_tail)
+                futures = {}
+                try:
+                    while True:
+                        # Bounded, a future per tile outweighs the tile itself.
+                        for tile, path, key in islice(
+                                remaining, workers * PROBES_IN_FLIGHT - len(futures)):
+                            # Probe threads log through the scan's record sink.
+                            futures[executor.submit(contextvars.copy_context().run,
+                                                    probe, path)] = (tile, key)
+                        if not futures:
+                            break
+                        finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            tile, key = futures.pop(future)
+                            metadata = future.result()
+                            tile.update(metadata)
+                            probed.append((key, metadata))
+                            done += 1
+                            if done % PROGRESS_EVERY == 0:
+                                emit({"type": "progress", "stage": "probed",
+                                      "done": done, "total": total})
+                            yield tile
+                finally:
+                    # Stopped early, don't wait on queued probes.
+                    for future in futures:
+                        future.cancel()
+        emit({"type": "progress", "stage": "probed", "done": done, "total": total})
+    finally:
+        if cache:
+            cache.store([(key, metadata) for key, metadata in probed if "res" in metadata])
+
+
+def get_metadata(image_list: list, workers: int=None, cache=None,
+                 check_tail: bool=False) -> list:
+    """Collects key image information into each tile
+    then returns the list, see iter_metadata."""
+    for _ in iter_metadata(image_list, workers, cache, check_tail):
+        pass
     return image_list
 
 
-def find_target_files(input_path: str) -> list:
-    """Returns a list of image files, seperated into
-    a dictionary for each file."""
+def target_file(dirpath: str, file: str) -> ScanTile:
+    """ScanTile for a udim tile of a target file type,
+    None for anything else."""
+    match = TXT_REGEX.match(file)
+    if match and match.group("ext") in TARGET_FILETYPES:
+        return ScanTile(match.group("name"), match.group("ext"), match.group("udim"),
+                        dirpath, file)
+    return None
+
+
+def classify_folders(folders: list) -> list:
+    """target_file over [(dirpath, names)], for the process pool."""
+    return [info for dirpath, names in folders
+            for info in map(partial(target_file, dirpath), names) if info]
+
+
+def walk_batches(root: str, budget: ScanBudget, counted: list, batch_size: int):
+    """Batches of (dirpath, names) below root, counting files
+    into counted[0] and trimming the last folder to the budget."""
+    batch = []
+    batch_files = 0
+    for dirpath, names in walk_folders(root):
+        count = counted[0]
+        if budget and (budget.over_files(count) or budget.over_time()):
+            break
+        if budget and budget.max_files:
+            names = names[:budget.max_files - count]
+        counted[0] = count + len(names)
+        if count // PROGRESS_EVERY != counted[0] // PROGRESS_EVERY:
+            emit({"type": "progress", "stage": "walked", "done": counted[0]})
+
+        batch.append((dirpath, names))
+        batch_files += len(names)
+        if batch_files >= batch_size:
+            yield batch
+            batch = []
+            batch_files = 0
+    if batch:
+        yield batch
+
+
+def find_target_files(input_path, budget: ScanBudget=None,
+                      processes: int=CLASSIFY_PROCESSES) -> list:
+    """Returns a list of image files, a ScanTile for
+    each file tagged with its root. Takes
+    one root or a list. Counts every file in the same walk,
+    returns None for no files. The walk stops early once
+    the budget is used up. With processes, names are matched
+    in a process pool, the order of files is unchanged."""
     log("[DEBUG] find target files func started.")
+    roots = [input_path] if isinstance(input_path, str) else input_path
     image_file_list = []
-    for dirpath, _, files in os.walk(input_path):
-        for file in files:
-            match = TXT_REGEX.match(file)
-            if match and match.group("ext") in TARGET_FILETYPES:
-                image_info = {
-                    "name": match.group("name"),
-                    "udim": match.group("udim"),
-                    "file_type": match.group("ext"),
-                    "path": os.path.join(dirpath, file)
-                            }
-                image_file_list.append(image_info)
+    counted = [0]
+    pool = ProcessPoolExecutor(processes) if processes else None
+    try:
+        for root in roots:
+            start = len(image_file_list)
+            pending = deque()
+            for batch in walk_batches(root, budget, counted,
+                                      CLASSIFY_BATCH if pool else 1):
+                if not pool:
+                    image_file_list.extend(classify_folders(batch))
+                    continue
+                # Bounded so a fast walk doesn't queue the whole tree.
+                if len(pending) >= processes * 4:
+                    image_file_list.extend(pending.popleft().result())
+                pending.append(pool.submit(classify_folders, batch))
+            for future in pending:
+                image_file_list.extend(future.result())
+
+            for tile in image_file_list[start:]:
+                tile.root = root
+            if budget and budget.reached:
+                break
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+    count = counted[0]
+
+    current_metrics().count("walked", count)
+    current_metrics().count("matched", len(image_file_list))
+
+    if count == 0:
+        log(f"[ZeroFileError] '{count}' image files found in {', '.join(roots)}")
+        return None
+    log(f"[FileCount] {count}")
     return image_file_list 
 
 
-def collect_image_data(path: str):
-    target_files = find_target_files(path)
-    target_files_and_image_data = get_metadata(target_files)
-    return target_files_and_image_data
+def fill_from_first_tile(tiles: list):
+    """Copy first tile metadata onto the rest of its set,
+    unverified until verify_texture_sets runs."""
+    first = tiles[0]
+    for tile in tiles[1:]:
+        tile.res, tile.bitdepth, tile.channels = first.res, first.bitdepth, first.channels
 
 
-def organise_image_data(image_dict: dict) -> dict:
-    """Organise a nested dictionary with following structure
-    name; ext; [{udims / images}]."""
-    organized = defaultdict(lambda: defaultdict(list))
+def emit_set(key: tuple, tiles: list):
+    """Set record for the set key of organised."""
+    emit({"type": "set", **key_fields(key), "tiles": [tile.record() for tile in tiles]})
 
-    for d in image_dict:
-        name = d["name"]
-        ext = d["file_type"]
-        image = {"udim": d["udim"], 
-                 "path": d["path"], 
-                "res": d["res"], 
-                "bitdepth": d["bitdepth"], 
-                "channels": d["channels"]}
-        organized[name][ext].append(image)
 
-    # Sort keys / file names alphabetically.
-    organised_keys = OrderedDict(sorted(organized.items()))
+def stream_texture_sets(organised: dict, full_probe: bool=False, cache=None,
+                        budget: ScanBudget=None):
+    """Probe texture sets, emitting each set record as soon as
+    its tiles are probed. Only the first tile of each set is
+    probed unless full_probe. Stops if out of time."""
+    owners = {}
+    remaining = {}
+    probe_list = []
+    for key, tiles in organised.items():
+        probe_tiles = tiles if full_probe else tiles[:1]
+        remaining[key] = len(probe_tiles)
+        for tile in probe_tiles:
+            owners[id(tile)] = key
+        probe_list.extend(probe_tiles)
+
+    with contextlib.closing(iter_metadata(probe_list, cache=cache)) as probed:
+        for tile in probed:
+            if budget and budget.over_time():
+                break
+            emit_probed_tile(organised, tile, owners, remaining, full_probe)
 
-    # Sort images / udims numerically 1001-1050 etc.
-    for name in organised_keys:
-        for ext in organised_keys[name]:
-            organised_keys[name][ext].sort(key=lambda x: x["udim"])
-    
-    # Convert back to normal dict.
-    organized = {k: dict(v) for k, v in organised_keys.items()}
-    return organized
 
+def emit_probed_tile(organised: dict, tile: ScanTile, owners: dict,
+                     remaining: dict, full_probe: bool):
+    """Emit the set a tile belongs to once all its probes are in."""
+    key = owners[id(tile)]
+    remaining[key] -= 1
+    if remaining[key] == 0:
+        tiles = organised[key]
+        if not full_probe:
+            fill_from_first_tile(tiles)
+        emit_set(key, tiles)
 
-def time_stamp():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return timestamp
 
+def verify_texture_sets(organised: dict, cache=None, budget: ScanBudget=None):
+    """Probe every tile, report tiles which differ from the
+    first tile of their set, as sent in its set record, or
+    which are unreadable / truncated. Tiles are probed in
+    place, leaving them with their own metadata. Stops if
+    out of time."""
+    log("[DEBUG] Verify started.")
+    image_list = []
+    expected = {}
+    for key, tiles in organised.items():
+        first = tiles[0]
+        expected[key] = (("res", first.res), ("bitdepth", first.bitdepth),
+                         ("channels", first.channels))
+        image_list.extend(tiles)
 
-def write_data_to_file(out_dir: str, data: dict):
-    """Write dict data to json file."""
-    time = time_stamp()
+    issues = 0
+    checked = 0
+    with contextlib.closing(iter_metadata(image_list, cache=cache, check_tail=True)) as probed:
+        for tile in probed:
+            if budget and budget.over_time():
+                break
+            checked += 1
+            if verify_tile(tile, expected[tile.set_key()]):
+                issues += 1
+    emit({"type": "verify_done", "tiles": checked, "issues": issues})
+
+
+def verify_tile(tile: ScanTile, expected: tuple) -> bool:
+    """Emit a verify record if the tile has problems,
+    expected is its set's ((key, value), ...)."""
+    problems = []
+    if not tile.complete:
+        problems.append(f"unreadable or truncated {tile.path}")
+    else:
+        for key, value in expected:
+            if getattr(tile, key) != value:
+                problems.append(f"{key} {getattr(tile, key)} (set {value})")
+    if problems:
+        current_metrics().count("verify_issues")
+        emit({"type": "verify", **key_fields(tile.set_key()),
+              "udim": tile.udim, "issue": ", ".join(problems)})
+    return bool(problems)
+
+
+def hash_tile(path: str) -> str:
     try:
-        if not data:
-            raise Exception("Data None when passed to function")
-        
-        out_path = f"{out_dir}/img_search_{time}.json"
-        with open(out_path, "w") as f:
-            json.dump(data, f, indent=4)
-        
-        log(f"[INFO] File wrote to: {out_path}")
-        log(f"[DataPath] {out_path}")
+        return hash_file(path)
+    except (OSError, ValueError) as e:
+        log(f"[HashError] {path}: {e}")
+        return None
 
-    except Exception as e:
-        log(f"[WriteDataError] Error called while writing data: {e}")
 
+def hash_tiles(paths: list, cache=None, budget: ScanBudget=None) -> dict:
+    """Content digest per path, unchanged files come from the
+    cache. Stops early if out of time."""
+    digests = {}
+    hashed = []
+    done = 0
+    with ThreadPoolExecutor(HASH_WORKERS) as executor:
+        keys = list(executor.map(cache.file_key, paths)) if cache else [None] * len(paths)
+        if cache:
+            digests = cache.lookup_hashes(keys, HASH_NAME)
+            current_metrics().count("hash_cache_hits", len(digests))
+        futures = {executor.submit(contextvars.copy_context().run, hash_tile, path): (path, key)
+                   for path, key in zip(paths, keys) if path not in digests}
+        try:
+            for future in as_completed(futures):
+                path, key = futures[future]
+                digest = future.result()
+                if digest:
+                    digests[path] = digest
+                    hashed.append((key, digest))
+                done += 1
+                if done % PROGRESS_EVERY == 0:
+                    emit({"type": "progress", "stage": "hashed",
+                          "done": done, "total": len(futures)})
+                if budget and budget.over_time():
+                    break
+        finally:
+            for future in futures:
+                future.cancel()
+    current_metrics().count("hashed", done)
+    if cache:
+        cache.store_hashes(hashed, HASH_NAME)
+    return digests
 
-def main(arg: str=None):
-    log("[DEBUG] Main module in run search started.")
-    path = arg
-    if user_input_handling(path):
-        image_search_data = collect_image_data(path)
-        
-        if image_search_data:
-            searh_data_organised = organise_image_data(image_search_data)
-            write_data_to_file(OUTDIR, searh_data_organised)
+
+def find_duplicate_sets(organised: dict, cache=None, budget: ScanBudget=None) -> list:
+    """Hash every tile and emit a duplicates record for each
+    group of byte identical sets, as [name, ext, root, template]
+    lists with the first set found listed first. Sets not
+    fully hashed are left out."""
+    log("[DEBUG] Hashing started.")
+    paths = [t.path for tiles in organised.values() for t in tiles]
+    digests = hash_tiles(paths, cache, budget)
+
+    groups = defaultdict(list)
+    for key, tiles in organised.items():
+        tile_digests = [(t.udim, digests.get(t.path)) for t in tiles]
+        if all(digest for _, digest in tile_digests):
+            fingerprint = hash_set(tile_digests)
+            groups[fingerprint].append(list(key))
+
+    duplicates = [sets for sets in groups.values() if len(sets) > 1]
+    for sets in duplicates:
+        emit({"type": "duplicates", "sets": sets})
+    log(f"[DEBUG] {len(duplicates)} groups of duplicate sets")
+    return duplicates
+
+
+def build_proxies(sets: list, res: int=PROXY_RES, bits: int=PROXY_BITS, cache=None):
+    """Make proxy tiles for sets, dicts of SET_FIELDS, res and
+    files, emitting a proxy record per set with the proxies'
+    $UDIM template in 'proxy'. Proxies already in PROXY_DIR
+    are reused. A set with any tile that failed gets None."""
+    log("[DEBUG] Proxy build started.")
+    paths = [path for s in sets for path in s["files"]]
+    digests = hash_tiles(paths, cache)
+    jobs = {}
+    for path in paths:
+        if path not in digests:
+            continue
+        dest = object_path(PROXY_DIR, digests[path], res, bits)
+        if not os.path.exists(dest):
+            jobs.setdefault(dest, path)
+
+    jobs = {dest: (make_proxy, source, dest, res, bits) for dest, source in jobs.items()}
+    failed, _ = run_tile_jobs(jobs, PROXY_PROCESSES, "proxied", "ProxyError")
+    current_metrics().count("proxies_made", len(jobs) - len(failed))
+
+    for s in sets:
+        tiles = []
+        for path in s["files"]:
+            info = target_file(os.path.dirname(path), os.path.basename(path))
+            digest = digests.get(path)
+            dest = digest and object_path(PROXY_DIR, digest, res, bits)
+            if info and dest and dest not in failed:
+                tiles.append((info.udim, dest))
+        record = {"type": "proxy", **{k: s.get(k) for k in SET_FIELDS},
+                  "proxy": None, "files": [], "res": None}
+        if tiles and len(tiles) == len(s["files"]):
+            width, height = (int(v) for v in s["res"].split("x"))
+            record.update(proxy=link_set(PROXY_DIR, s["name"], tiles, tile_ext(bits)),
+                          files=[dest for _, dest in tiles],
+                          res="{}x{}".format(*proxy_size(width, height, res)))
         else:
-            log("[NoTargetFiles] No target files found in path.")
+            log(f"[ProxyError] No proxies for {s['name']}, import it at full res.")
+        emit(record)
+
+
+def run_tile_jobs(jobs: dict, processes: int, stage: str, error_flag: str) -> tuple:
+    """Run {dest: (func, *args)} jobs in a process pool with
+    progress records. Returns (failed dests, {dest: seconds
+    the job reported taking})."""
+    failed = set()
+    work = {}
+    if not jobs:
+        return failed, work
+    with ProcessPoolExecutor(min(processes, len(jobs))) as pool:
+        futures = {pool.submit(*job): dest for dest, job in jobs.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            try:
+                work[futures[future]] = future.result() or 0.0
+            except Exception as e:
+                log(f"[{error_flag}] {e}")
+                failed.add(futures[future])
+            emit({"type": "progress", "stage": stage, "done": done, "total": len(jobs)})
+    return failed, work
+
+
+def needs_conversion(tile: ScanTile, size: str, bits: int) -> bool:
+    """Tile differs from its paint node's 'WxH' size or depth,
+    a depth OIIO didn't report counts as matching."""
+    if tile.res and tile.res != size:
+        return True
+    try:
+        return int(tile.bitdepth) != bits
+    except (TypeError, ValueError):
+        return False
+
+
+def build_conversions(sets: list, cache=None):
+    """Convert tiles that don't match their paint node ahead of
+    import. sets are dicts of SET_FIELDS, files, size ('WxH')
+    and bits. Emits a converted record, the $UDIM template of
+    the converted tiles in 'converted', for each set that
+    needed it, then convert_done with the time saved: Mari
+    converts mismatched tiles on one import thread, here the
+    same work runs in parallel. Only those tiles count, tiles
+    already converted in CONVERT_DIR count as saving the
+    average conversion."""
+    log("[DEBUG] Pre-conversion started.")
+    start = time.perf_counter()
+    image_list = get_metadata([target_file(*os.path.split(path))
+                               for s in sets for path in s["files"]], cache=cache)
+    metadata = {tile.path: tile for tile in image_list}
+
+    plans = []
+    for s in sets:
+        mismatched = {p for p in s["files"]
+                      if needs_conversion(metadata[p], s["size"], s["bits"])}
+        if not mismatched:
+            continue
+        # A $UDIM template needs one file type, so convert every tile
+        # when the converted type differs from the set's.
+        convert = set(s["files"]) if s["ext"] != tile_ext(s["bits"]) else mismatched
+        plans.append((s, mismatched, convert))
+    # Only tiles being converted are read, most tiles often match.
+    digests = hash_tiles(list({p for _, _, convert in plans for p in convert}), cache)
+
+    jobs = {}
+    needed = set()
+    reused = set()
+    for i, (s, mismatched, convert) in enumerate(plans):
+        size, bits = s["size"], s["bits"]
+        width, height = (int(v) for v in size.split("x"))
+        tiles = []
+        for path in s["files"]:
+            udim = metadata[path].udim
+            if path not in convert:
+                tiles.append((udim, path))
+                continue
+            elif path not in digests:
+                tiles = None
+                break
+            dest = object_path(CONVERT_DIR, digests[path], size, bits)
+            if dest not in jobs and os.path.exists(dest):
+                reused.add(dest)
+            elif dest not in jobs:
+                jobs[dest] = (convert_tile, path, dest, bits, width, height)
+            if path in mismatched:
+                needed.add(dest)
+            tiles.append((udim, dest))
+        plans[i] = (s, tiles)
+
+    failed, work = run_tile_jobs(jobs, CONVERT_PROCESSES, "converted", "ConvertError")
+    for s, tiles in plans:
+        if not tiles or any(path in failed for _, path in tiles):
+            log(f"[ConvertError] {s['name']} not converted, Mari will convert it on import.")
+            continue
+        emit({"type": "converted", **{k: s.get(k) for k in SET_FIELDS},
+              "converted": link_set(CONVERT_DIR, s["name"], tiles, tile_ext(s["bits"])),
+              "files": [path for _, path in tiles]})
+
+    converted = len(jobs) - len(failed)
+    wall = time.perf_counter() - start
+    saved = [seconds for dest, seconds in work.items() if dest in needed]
+    per_tile = sum(saved) / len(saved) if saved else 0.0
+    current_metrics().count("tiles_converted", converted)
+    emit({"type": "convert_done", "converted": converted, "reused": len(reused),
+          "work_s": round(sum(work.values(), 0.0), 2), "wall_s": round(wall, 2),
+          "saved_s": round(max(sum(saved) + len(reused & needed) * per_tile - wall, 0.0), 2)})
+
+
+def organise_image_data(image_list: list) -> dict:
+    """Organise tiles into a dictionary of set key (name, ext,
+    root, $UDIM template); [ScanTiles sorted by udim]. The
+    tiles are the ones passed in, not copies. A tile whose
+    real folder and file were already found, through a
+    symlink or copied root, is skipped."""
+    organized = defaultdict(list)
+    real_folders = {}
+    seen = set()
+    duplicates = 0
+
+    for tile in image_list:
+        # One realpath per folder rather than per tile, a linked
+        # folder then drops its whole set and never part of one.
+        folder = real_folders.get(tile.folder)
+        if folder is None:
+            folder = real_folders[tile.folder] = os.path.realpath(tile.folder)
+        if (folder, tile.file) in seen:
+            duplicates += 1
+            continue
+        seen.add((folder, tile.file))
+        organized[tile.set_key()].append(tile)
+
+    if duplicates:
+        log(f"[DuplicateTiles] {duplicates} tiles skipped, already found at another path.")
+
+    # Sort keys / file names alphabetically, images / udims
+    # numerically 1001-1050 etc.
+    organised_keys = {key: organized[key] for key in sorted(organized)}
+    for tiles in organised_keys.values():
+        tiles.sort(key=attrgetter("udim"))
+    return organised_keys
+
+
+def update_texture_sets(organised: dict, paths: set, cache=None, roots: list=None):
+    """Apply changed paths to organised, probing only tiles
+    which were created or modified. Emits a set record for
+    each changed set, removed if its last tile went."""
+    touched = set()
+    gone = {p for p in paths if not os.path.isfile(p)}
+    if gone:
+        # A deleted folder takes every tile below it.
+        folders = tuple(p.rstrip(os.sep) + os.sep for p in gone)
+        for key, tiles in organised.items():
+            kept = [t for t in tiles
+                    if t.path not in gone and not t.path.startswith(folders)]
+            if len(kept) != len(tiles):
+                organised[key] = kept
+                touched.add(key)
+
+    changed = [target_file(*os.path.split(p)) for p in paths - gone]
+    changed = [d for d in changed if d]
+    for tile in get_metadata(changed, cache=cache):
+        path = tile.path
+        tile.root = root_of(path, roots or [])
+        key = tile.set_key()
+        tiles = organised.setdefault(key, [])
+        tiles[:] = [t for t in tiles if t.path != path]
+        tiles.append(tile)
+        tiles.sort(key=attrgetter("udim"))
+        touched.add(key)
+
+    for key in sorted(touched):
+        tiles = organised[key]
+        if not tiles:
+            del organised[key]
+            emit({"type": "removed", **key_fields(key)})
+            continue
+        if tiles[0].res is None:
+            get_metadata(tiles[:1], cache=cache)
+        emit_set(key, tiles)
+    if cache:
+        cache.commit()
+
+
+def watch_texture_sets(roots: list, organised: dict, cache=None,
+                       stop: threading.Event=None):
+    """Keep organised current until stop is set or orphaned,
+    streaming records for sets as their tiles change."""
+    watcher, reason = make_watcher(roots)
+    if reason:
+        log(f"[DEBUG] inotify unavailable ({reason}), polling instead.")
+    log(f"[Watching] {', '.join(roots)} ({watcher.kind})")
+    parent = os.getppid()
+    with watcher:
+        while os.getppid() == parent and not (stop and stop.is_set()):
+            changed = wait_for_changes(watcher, WATCH_HEARTBEAT)
+            if changed is None:
+                # Events were lost, recheck every known and current tile.
+                log("[DEBUG] Watch events lost, rescanning.")
+                changed = {t.path for tiles in organised.values() for t in tiles}
+                changed.update(os.path.join(d, f) for root in roots
+                               for d, f in walk_files(root))
+            if changed:
+                update_texture_sets(organised, changed, cache, roots)
+
+
+def main(arg=None, full_probe: bool=False, watch: bool=False,
+         max_files: int=FILE_BUDGET, time_budget: float=TIME_BUDGET,
+         find_duplicates: bool=False):
+    """Write scan records to stdout as NDJSON, see iter_scan."""
+    for record in iter_scan(arg, full_probe, watch, max_files, time_budget,
+                            find_duplicates):
+        write_record(record)
+
+
+# === Library API ===
+
+def iter_scan(paths, full_probe: bool=False, watch: bool=False,
+              max_files: int=FILE_BUDGET, time_budget: float=TIME_BUDGET,
+              find_duplicates: bool=False, queue_size: int=SCAN_QUEUE_SIZE):
+    """Scan one path or a list of roots on a background thread,
+    yielding protocol records (see emit). Set records come as
+    soon as each texture set is probed. Beyond queue_size
+    unread records the scan waits for the consumer, closing
+    the generator cancels it."""
+    records = queue.Queue(queue_size)
+    stop = threading.Event()
+
+    def sink(record):
+        while not stop.is_set():
+            try:
+                records.put(record, timeout=CANCEL_POLL_SECONDS)
+                return
+            except queue.Full:
+                pass
+        raise ScanCancelled()
+
+    thread = start_scan(sink, stop, paths, full_probe, watch, max_files, time_budget,
+                        find_duplicates)
+    try:
+        while True:
+            record = records.get()
+            if record is _SCAN_END:
+                return
+            elif isinstance(record, Exception):
+                raise record
+            yield record
+    finally:
+        stop.set()
+        thread.join()
+
+
+async def aiter_scan(paths, full_probe: bool=False, watch: bool=False,
+                     max_files: int=FILE_BUDGET, time_budget: float=TIME_BUDGET,
+                     find_duplicates: bool=False, queue_size: int=SCAN_QUEUE_SIZE):
+    """Async version of iter_scan. The scan still runs on a
+    thread, waiting on a slow consumer without blocking the
+    event loop. Cancelling the consuming task cancels it."""
+    loop = asyncio.get_running_loop()
+    records = asyncio.Queue(queue_size)
+    stop = threading.Event()
+
+    def sink(record):
+        future = asyncio.run_coroutine_threadsafe(records.put(record), loop)
+        while not stop.is_set():
+            try:
+                return future.result(timeout=CANCEL_POLL_SECONDS)
+            except FutureTimeoutError:
+                pass
+        future.cancel()
+        raise ScanCancelled()
+
+    thread = start_scan(sink, stop, paths, full_probe, watch, max_files, time_budget,
+                        find_duplicates)
+    try:
+        while True:
+            record = await records.get()
+            if record is _SCAN_END:
+                return
+            elif isinstance(record, Exception):
+                raise record
+            yield record
+    finally:
+        stop.set()
+        await loop.run_in_executor(None, thread.join)
+
+
+def start_scan(sink, stop: threading.Event, *args) -> threading.Thread:
+    """Run run_scan on a thread with records going to sink,
+    ending with _SCAN_END or the exception that stopped it."""
+    def produce():
+        _record_sink.set(sink)
+        end = _SCAN_END
+        try:
+            run_scan(*args, stop=stop)
+        except ScanCancelled:
+            return
+        except Exception as e:
+            end = e
+        try:
+            sink(end)
+        except ScanCancelled:
+            pass
+
+    thread = threading.Thread(target=produce, name="run_search-scan", daemon=True)
+    thread.start()
+    return thread
+
+
+def run_scan(arg=None, full_probe: bool=False, watch: bool=False,
+             max_files: int=FILE_BUDGET, time_budget: float=TIME_BUDGET,
+             find_duplicates: bool=False, stop: threading.Event=None):
+    """Search one path or a list of roots in a single pass,
+    emitting a set record per texture set followed by verify
+    records for the remaining tiles, then duplicates records
+    if find_duplicates. With watch, keeps emitting changes
+    until stop is set."""
+    log("[DEBUG] Main module in run search started.")
+    roots = resolve_roots(arg)
+    if not roots:
+        return
+
+    _scan_metrics.set(ScanMetrics())
+    budget = ScanBudget(max_files, time_budget)
+    cache = open_cache()
+    try:
+        try:
+            organised = scan(roots, full_probe, cache, watch, budget, find_duplicates)
+        finally:
+            emit(current_metrics().record())
+        if watch and organised is not None:
+            if cache:
+                cache.commit()
+            watch_texture_sets(roots, organised, cache, stop)
+    finally:
+        if cache:
+            cache.close()
+
+
+def scan(roots: list, full_probe: bool=False, cache=None, watch: bool=False,
+         budget: ScanBudget=None, find_duplicates: bool=False) -> dict:
+    """Timed scan phases, returns organised texture sets
+    or None if the search was aborted."""
+    with current_metrics().span("walk"):
+        target_files = find_target_files(roots, budget)
+    if target_files is None:
+        # An empty folder is normal for a new export location,
+        # watching waits for the first files.
+        if not watch:
+            return None
+        target_files = []
+    elif not target_files:
+        log("[NoTargetFiles] No target files found in path.")
+        if not watch:
+            return None
+
+    with current_metrics().span("organise"):
+        organised = organise_image_data(target_files)
+    with current_metrics().span("stream"):
+        stream_texture_sets(organised, full_probe, cache, budget)
+    if not full_probe:
+        with current_metrics().span("verify"):
+            verify_texture_sets(organised, cache, budget)
+    if find_duplicates:
+        with current_metrics().span("hash"):
+            find_duplicate_sets(organised, cache, budget)
+    return organised
+
+
+def handle_request(request: dict):
+    """Run a single worker request, output goes to stdout."""
+    cmd = request.get("cmd")
+    if cmd == "ping":
+        emit({"type": "pong", "pid": os.getpid()})
+    elif cmd == "proxy":
+        cache = open_cache()
+        try:
+            build_proxies(request["sets"], request.get("res", PROXY_RES),
+                          request.get("bits", PROXY_BITS), cache)
+        finally:
+            if cache:
+                cache.close()
+    elif cmd == "convert":
+        cache = open_cache()
+        try:
+            build_conversions(request["sets"], cache)
+        finally:
+            if cache:
+                cache.close()
+    elif cmd == "scan":
+        main(request.get("paths") or request.get("path"), request.get("full", False),
+             max_files=request.get("max_files", FILE_BUDGET),
+             time_budget=request.get("time_budget", TIME_BUDGET),
+             find_duplicates=request.get("find_duplicates", False))
+    else:
+        log(f"[WorkerError] Unknown command {cmd}")
+
+
+def serve(socket_path: str, idle_timeout: float=WORKER_IDLE_TIMEOUT):
+    """Keep interpreter and OIIO warm, answering one JSON line
+    request per connection over a unix socket. Output is
+    streamed back record by record, ending with worker_done."""
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    # A worker started after this one may have replaced the socket,
+    # only the one bound here is removed on exit.
+    bound = os.stat(socket_path).st_ino
+    server.listen(1)
+    server.settimeout(idle_timeout)
+    log(f"[WorkerReady] {socket_path}")
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                log(f"[WorkerIdle] No requests for {idle_timeout}s, exiting.")
+                break
+            conn.settimeout(None)
+            with conn, conn.makefile("r", encoding="utf-8") as reader, \
+                    conn.makefile("w", encoding="utf-8", buffering=1) as writer:
+                try:
+                    request = json.loads(reader.readline() or "{}")
+                    with contextlib.redirect_stdout(writer):
+                        try:
+                            handle_request(request)
+                        except Exception as e:
+                            log(f"[WorkerError] {e}")
+                        emit({"type": "worker_done"})
+                except (OSError, ValueError) as e:
+                    # Client went away or sent garbage, keep serving.
+                    print(f"[DEBUG] Dropped request: {e}", file=sys.stderr)
+    finally:
+        server.close()
+        try:
+            if os.stat(socket_path).st_ino == bound:
+                os.unlink(socket_path)
+        except OSError:
+            pass
+
+
+def parse_args(argv: list):
+    parser = argparse.ArgumentParser(description="Search folder for udim image sets.")
+    parser.add_argument("paths", nargs="*", metavar="path",
+                        help="Folders to search, results are merged.")
+    parser.add_argument("--full", action="store_true",
+                        help="Probe every tile header instead of one per set "
+                             "and skip the verify pass.")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running after the scan, streaming sets "
+                             "as their tiles are written or deleted.")
+    parser.add_argument("--max-files", type=int, default=FILE_BUDGET,
+                        help="Stop walking after this many files, 0 for no limit.")
+    parser.add_argument("--time-budget", type=float, default=TIME_BUDGET,
+                        help="Stop the scan after this many seconds.")
+    parser.add_argument("--find-duplicates", action="store_true",
+                        help="Hash tile contents and report byte identical sets.")
+    parser.add_argument("--serve", metavar="SOCKET_PATH",
+                        help="Run as a warm worker listening on a unix socket.")
+    parser.add_argument("--idle-timeout", type=float, default=WORKER_IDLE_TIMEOUT,
+                        help="Seconds a worker waits for a request before exiting.")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
@@ -167,8 +1191,12 @@ if __name__ == "__main__":
         log("[SubprocessError] no arg passed to run_search")
         sys.exit(1)
     
-    arg = str(sys.argv[1])
+    args = parse_args(sys.argv[1:])
 
-    log(f"[DEBUG] Arg passed {arg}")
+    log(f"[DEBUG] Arg passed {sys.argv[1:]}")
 
-    main(arg)
+    if args.serve:
+        serve(args.serve, args.idle_timeout)
+    else:
+        main(args.paths, args.full, args.watch, args.max_files, args.time_budget,
+             args.find_duplicates)
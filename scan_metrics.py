@@ -0,0 +1,81 @@
+import time
+import bisect
+import threading
+import contextlib
+
+# Probe latency histogram bucket upper bounds in milliseconds.
+LATENCY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class ScanMetrics:
+    """Phase timings, counters and a probe latency histogram
+    for one scan. Safe to update from probe threads."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+
+    def reset(self):
+        with self.lock:
+            self.start = time.perf_counter()
+            self.spans = {}
+            self.counters = {}
+            self.latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            self.latency_total = 0.0
+            self.latency_max = 0.0
+
+
+    @contextlib.contextmanager
+    def span(self, name: str):
+        """Time a phase, repeated spans of a name add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+
+    def add_time(self, name: str, seconds: float):
+        with self.lock:
+            self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+
+    def count(self, name: str, n: int=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+
+    def probe_latency(self, seconds: float):
+        ms = seconds * 1000
+        with self.lock:
+            self.latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            self.latency_total += ms
+            self.latency_max = max(self.latency_max, ms)
+
+
+    def record(self) -> dict:
+        """Metrics protocol record."""
+        with self.lock:
+            probes = sum(self.latency_counts)
+            return {
+                "type": "metrics",
+                "total_s": round(time.perf_counter() - self.start, 4),
+                "spans": {k: round(v, 4) for k, v in self.spans.items()},
+                "counters": dict(self.counters),
+                "probe_latency_ms": {
+                    "le": list(LATENCY_BUCKETS_MS) + ["inf"],
+                    "counts": list(self.latency_counts),
+                    "mean": round(self.latency_total / probes, 3) if probes else None,
+                    "max": round(self.latency_max, 3)}
+                }
+
+
+def summarise(record: dict) -> str:
+    """One line summary of a metrics record for the log."""
+    spans = ", ".join(f"{k} {v:.2f}s" for k, v in record["spans"].items())
+    counters = ", ".join(f"{k} {v}" for k, v in record["counters"].items())
+    latency = record["probe_latency_ms"]
+    text = f"total {record['total_s']:.2f}s; {spans}; {counters}"
+    if latency["mean"] is not None:
+        text += f"; probe mean {latency['mean']:.2f}ms max {latency['max']:.2f}ms"
+    return text
@@ -0,0 +1,207 @@
+# Binary snapshot of scan results, so a project's last scan can be
+# reloaded without rescanning. Layout after the header is one zlib
+# stream: a JSON meta block, a string table and typed arrays, all
+# little endian. Bump VERSION on any layout change.
+import os
+import sys
+import json
+import zlib
+import struct
+from array import array
+
+MAGIC = b"ITSS"
+VERSION = 3
+HEADER = struct.Struct("<4sH")
+SECTION = struct.Struct("<cI")
+NONE = -1
+
+
+class SnapshotError(Exception):
+    pass
+
+
+class StringTable:
+    """Each distinct string stored once, referenced by index."""
+    def __init__(self, strings: list=None):
+        self.strings = strings or []
+        self.index = {s: i for i, s in enumerate(self.strings)}
+
+
+    def add(self, value: str) -> int:
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return i
+
+
+    def encode(self) -> bytes:
+        # Paths can't hold NUL so it is a safe separator.
+        return "\0".join(self.strings).encode("utf-8", "surrogateescape")
+
+
+    @classmethod
+    def decode(cls, data: bytes):
+        return cls(data.decode("utf-8", "surrogateescape").split("\0") if data else [])
+
+
+def pack_array(typecode: str, values) -> bytes:
+    values = array(typecode, values)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return SECTION.pack(typecode.encode(), len(values)) + values.tobytes()
+
+
+def unpack_array(data: bytes, offset: int) -> tuple:
+    """Returns (array, next offset)."""
+    typecode, count = SECTION.unpack_from(data, offset)
+    offset += SECTION.size
+    values = array(typecode.decode())
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def pack_bytes(data: bytes) -> bytes:
+    return SECTION.pack(b"B", len(data)) + data
+
+
+def unpack_bytes(data: bytes, offset: int) -> tuple:
+    _, length = SECTION.unpack_from(data, offset)
+    offset += SECTION.size
+    return data[offset:offset + length], offset + length
+
+
+def tile_folders(texture_sets: list) -> list:
+    """Folders holding tiles, their parents up to the scan
+    root and the root itself, for the stale check."""
+    folders = set()
+    for texture_set in texture_sets:
+        root = texture_set.root and texture_set.root.rstrip(os.sep)
+        if root:
+            folders.add(root)
+        for tile in texture_set.tiles:
+            folder = os.path.dirname(tile.path)
+            while folder not in folders:
+                folders.add(folder)
+                parent = os.path.dirname(folder)
+                if parent == folder or not root:
+                    break
+                folder = parent
+    return sorted(folders)
+
+
+def folder_mtime(folder: str) -> int:
+    try:
+        return os.stat(folder).st_mtime_ns
+    except OSError:
+        return NONE
+
+
+def save_snapshot(path: str, texture_sets: list, meta: dict=None):
+    """Write TextureSets (see scan_store) to path. meta is any
+    JSON-able dict stored alongside, e.g. roots and issues."""
+    texture_sets = list(texture_sets)
+    strings = StringTable()
+    set_names, set_exts, tile_counts = array("I"), array("I"), array("I")
+    set_roots, set_templates = array("i"), array("I")
+    udims, dirs, files = array("H"), array("I"), array("I")
+    res, depths, channels = array("i"), array("i"), array("i")
+
+    for texture_set in texture_sets:
+        set_names.append(strings.add(texture_set.name))
+        set_exts.append(strings.add(texture_set.ext))
+        tile_counts.append(len(texture_set.tiles))
+        set_roots.append(NONE if texture_set.root is None else strings.add(texture_set.root))
+        # Kept as scanned, rebuilding it from a tile path could differ.
+        set_templates.append(strings.add(texture_set.template))
+        for tile in texture_set.tiles:
+            folder, name = os.path.split(tile.path)
+            udims.append(int(tile.udim))
+            dirs.append(strings.add(folder))
+            files.append(strings.add(name))
+            res.append(NONE if tile.res is None else strings.add(tile.res))
+            # Bitdepth comes straight from OIIO attribs, keep its JSON form.
+            depths.append(strings.add(json.dumps(tile.bitdepth)))
+            channels.append(NONE if tile.channels is None else tile.channels)
+
+    folders = tile_folders(texture_sets)
+    folder_ids = array("I", (strings.add(f) for f in folders))
+    mtimes = array("q", (folder_mtime(f) for f in folders))
+
+    payload = b"".join([
+        pack_bytes(json.dumps(meta or {}).encode("utf-8")),
+        pack_bytes(strings.encode()),
+        *(pack_array(a.typecode, a) for a in (
+            set_names, set_exts, tile_counts, set_roots, set_templates,
+            udims, dirs, files, res, depths, channels, folder_ids, mtimes))])
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION))
+        f.write(zlib.compress(payload, 6))
+    os.replace(tmp_path, path)
+
+
+def read_payload(path: str) -> bytes:
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise SnapshotError(f"{path} is not a scan snapshot")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError(f"{path} is not a scan snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"{path} is snapshot version {version}, expected {VERSION}")
+    try:
+        return zlib.decompress(data[HEADER.size:])
+    except zlib.error as e:
+        raise SnapshotError(f"{path} is corrupt: {e}")
+
+
+def load_snapshot(path: str) -> tuple:
+    """Returns (meta, sets, folders). sets is a list of
+    (name, ext, root, template, tile dicts), folders maps
+    each folder to its mtime when saved. Raises SnapshotError."""
+    payload = read_payload(path)
+    meta, offset = unpack_bytes(payload, 0)
+    string_data, offset = unpack_bytes(payload, offset)
+    strings = StringTable.decode(string_data).strings
+    arrays = []
+    for _ in range(13):
+        values, offset = unpack_array(payload, offset)
+        arrays.append(values)
+    (set_names, set_exts, tile_counts, set_roots, set_templates,
+     udims, dirs, files, res, depths, channels, folder_ids, mtimes) = arrays
+
+    sets = []
+    tile_start = 0
+    depth_values = {}
+    for name, ext, tile_count, root, template in zip(set_names, set_exts, tile_counts,
+                                                     set_roots, set_templates):
+        tiles = []
+        for i in range(tile_start, tile_start + tile_count):
+            depth = depths[i]
+            if depth not in depth_values:
+                depth_values[depth] = json.loads(strings[depth])
+            tiles.append({
+                "udim": f"{udims[i]:04d}",
+                "path": os.path.join(strings[dirs[i]], strings[files[i]]),
+                "res": None if res[i] == NONE else strings[res[i]],
+                "bitdepth": depth_values[depth],
+                "channels": None if channels[i] == NONE else channels[i]})
+        tile_start += tile_count
+        sets.append((strings[name], strings[ext], None if root == NONE else strings[root],
+                     strings[template], tiles))
+
+    folders = {strings[i]: mtime for i, mtime in zip(folder_ids, mtimes)}
+    return json.loads(meta.decode("utf-8")), sets, folders
+
+
+def stale_folders(folders: dict) -> list:
+    """Folders whose mtime changed since the snapshot, files
+    added, removed or renamed in them. In place edits of a
+    tile don't touch its folder so aren't caught."""
+    return [f for f, mtime in folders.items() if folder_mtime(f) != mtime]
@@ -0,0 +1,137 @@
+import os
+import re
+
+# Example match / groups 'opacity.1001.tif' --> (opacity<name>)(.<sep>)(1001<udim>).(tif<ext>)
+TXT_REGEX = re.compile(r'^(?P<name>.+?)(?P<sep>[^0-9])(?P<udim>\d{4})\.(?P<ext>\w+)$', re.IGNORECASE)
+
+
+def tile_template(img_path: str) -> str:
+    """Return $UDIM template for importing the set a tile belongs to."""
+    f = TXT_REGEX.match(os.path.basename(img_path))
+    name, sep, ext = f.group("name"), f.group("sep"), f.group("ext")
+    template = f"{os.path.dirname(img_path)}/{name}{sep}$UDIM.{ext}"
+    return template
+
+
+class TileRecord:
+    """Single udim tile of a texture set."""
+    __slots__ = ("udim", "path", "res", "bitdepth", "channels")
+
+    def __init__(self, udim: str, path: str, res: str=None,
+                 bitdepth=None, channels: int=None):
+        self.udim = udim
+        self.path = path
+        self.res = res
+        self.bitdepth = bitdepth
+        self.channels = channels
+
+
+# Fields naming a set in run_search records.
+SET_FIELDS = ("name", "ext", "root", "template")
+
+
+def set_key(name: str, ext: str, root: str=None, template: str=None) -> tuple:
+    """Key of a set, sets with the same name and file type in
+    other folders or roots are kept apart by root / template."""
+    return (name, ext.lower(), root or "", template or "")
+
+
+def record_key(record: dict) -> tuple:
+    """set_key of a run_search record naming a set."""
+    return set_key(*(record.get(field) for field in SET_FIELDS))
+
+
+def key_fields(key: tuple) -> dict:
+    """Record fields naming the set with key."""
+    return dict(zip(SET_FIELDS, key))
+
+
+def root_label(root: str, folder: str) -> str:
+    """Root column text, the root's folder name followed by
+    the set's folder below it, if any."""
+    if not root:
+        return ""
+    root = root.rstrip("/")
+    label = os.path.basename(root) or root
+    if folder.startswith(root + "/"):
+        label = f"{label}/{folder[len(root) + 1:]}"
+    return label
+
+
+class TextureSet:
+    """Tiles of one $UDIM template with the paths, key and
+    table summary worked out once when added. root is the
+    scan root the tiles were found under."""
+    __slots__ = ("name", "ext", "tiles", "root", "paths", "template", "key", "summary")
+
+    def __init__(self, name: str, ext: str, tiles: list, root: str=None,
+                 template: str=None):
+        self.name = name
+        self.ext = ext
+        self.root = root
+        self.tiles = tuple(TileRecord(**{k: t.get(k) for k in TileRecord.__slots__})
+                           for t in tiles)
+        self.paths = [t.path for t in self.tiles]
+        self.template = template or tile_template(self.paths[0])
+        self.key = set_key(name, ext, root, self.template)
+        self.summary = self.make_summary()
+
+
+    def make_summary(self) -> dict:
+        """Table row for the set, values from first tile."""
+        first = self.tiles[0]
+        colourspace = "scalar" if first.channels == 1 else "color"
+        return {
+            "Name": self.name,
+            "File Type": self.ext.upper(),
+            "Udim Count": len(self.tiles),
+            "Size": first.res,
+            "Depth": f"{first.bitdepth}-bit",
+            "Colourspace": colourspace,
+            "Root": root_label(self.root, os.path.dirname(self.template))
+            }
+
+
+class ScanResultStore:
+    """Texture sets from a scan indexed by set_key."""
+    def __init__(self):
+        self.sets = {}
+
+
+    def __len__(self):
+        return len(self.sets)
+
+
+    def __contains__(self, key: tuple):
+        return key in self.sets
+
+
+    def clear(self):
+        self.sets = {}
+
+
+    def add_set(self, name: str, ext: str, tiles: list, root: str=None,
+                template: str=None) -> TextureSet:
+        """Add or replace a set from a list of tile dicts."""
+        texture_set = TextureSet(name, ext, tiles, root, template)
+        self.sets[texture_set.key] = texture_set
+        return texture_set
+
+
+    def add_record(self, record: dict) -> TextureSet:
+        """Add or replace a set from a run_search set record."""
+        return self.add_set(record["name"], record["ext"], record["tiles"],
+                            record.get("root"), record.get("template"))
+
+
+    def remove(self, key: tuple):
+        self.sets.pop(key, None)
+
+
+    def get(self, key: tuple) -> TextureSet:
+        return self.sets[key]
+
+
+    def sorted_sets(self) -> list:
+        """Every set sorted by name / file type / root."""
+        return [self.sets[key] for key in sorted(self.sets)]
@@ -0,0 +1,187 @@
+import os
+import json
+import time
+import sqlite3
+
+# Eviction limits, entries untouched for MAX_AGE_DAYS are dropped first
+# then the least recently used rows above MAX_ENTRIES.
+MAX_ENTRIES = 200000
+MAX_AGE_DAYS = 30
+
+# Several processes share the cache, writes are committed straight away
+# so the lock is only held briefly. A cache still locked after
+# LOCK_TIMEOUT seconds, or otherwise failing, is dropped for the rest of
+# the scan rather than failing it.
+LOCK_TIMEOUT = 10
+
+
+class MetadataCache:
+    """On disk cache of image header metadata and content
+    hashes keyed by path, inode, size and mtime. on_error(error)
+    is called if the cache fails and is dropped."""
+
+    def __init__(self, db_path: str, on_error=None):
+        self.db_path = db_path
+        self.on_error = on_error
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(db_path, timeout=LOCK_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS metadata (
+                path TEXT PRIMARY KEY,
+                inode INTEGER,
+                size INTEGER,
+                mtime INTEGER,
+                data TEXT,
+                accessed REAL)""")
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS metadata_accessed
+            ON metadata (accessed)""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT PRIMARY KEY,
+                inode INTEGER,
+                size INTEGER,
+                mtime INTEGER,
+                algorithm TEXT,
+                digest TEXT,
+                accessed REAL)""")
+        self.conn.execute("""
+            CREATE INDEX IF NOT EXISTS hashes_accessed
+            ON hashes (accessed)""")
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def failed(self, error: sqlite3.Error):
+        """Drop the connection, later calls find nothing."""
+        conn, self.conn = self.conn, None
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        if self.on_error:
+            self.on_error(error)
+
+
+    def file_key(self, path: str) -> tuple:
+        """Returns (path, inode, size, mtime) or None if missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (path, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+    def lookup(self, keys: list) -> dict:
+        """Returns {path: metadata} for keys with a matching
+        up to date entry, refreshes their access time."""
+        found = {}
+        now = time.time()
+        query = "SELECT inode, size, mtime, data FROM metadata WHERE path = ?"
+        try:
+            for key in keys:
+                if key is None or not self.conn:
+                    continue
+                path, inode, size, mtime = key
+                row = self.conn.execute(query, (path,)).fetchone()
+                if row and tuple(row[:3]) == (inode, size, mtime):
+                    found[path] = json.loads(row[3])
+            if found:
+                self.conn.executemany(
+                    "UPDATE metadata SET accessed = ? WHERE path = ?",
+                    [(now, path) for path in found])
+                self.conn.commit()
+        except sqlite3.Error as e:
+            self.failed(e)
+        self.hits += len(found)
+        self.misses += sum(1 for key in keys if key) - len(found)
+        return found
+
+
+    def store(self, entries: list):
+        """Insert or replace [(key, metadata)] entries."""
+        now = time.time()
+        rows = [(*key, json.dumps(metadata), now)
+                for key, metadata in entries if key and metadata]
+        self.write("INSERT OR REPLACE INTO metadata VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+
+    def lookup_hashes(self, keys: list, algorithm: str) -> dict:
+        """Returns {path: digest} for keys hashed with algorithm
+        since their last change."""
+        found = {}
+        query = "SELECT inode, size, mtime, algorithm, digest FROM hashes WHERE path = ?"
+        try:
+            for key in keys:
+                if key is None or not self.conn:
+                    continue
+                path, inode, size, mtime = key
+                row = self.conn.execute(query, (path,)).fetchone()
+                if row and tuple(row[:4]) == (inode, size, mtime, algorithm):
+                    found[path] = row[4]
+            if found:
+                self.conn.executemany(
+                    "UPDATE hashes SET accessed = ? WHERE path = ?",
+                    [(time.time(), path) for path in found])
+                self.conn.commit()
+        except sqlite3.Error as e:
+            self.failed(e)
+        return found
+
+
+    def store_hashes(self, entries: list, algorithm: str):
+        """Insert or replace [(key, digest)] entries."""
+        now = time.time()
+        rows = [(*key, algorithm, digest, now) for key, digest in entries if key and digest]
+        self.write("INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+    def write(self, sql: str, rows: list):
+        """Insert rows and commit so the write lock is released."""
+        if not rows or not self.conn:
+            return
+        try:
+            self.conn.executemany(sql, rows)
+            self.conn.commit()
+        except sqlite3.Error as e:
+            self.failed(e)
+
+
+    def commit(self):
+        """Make stored entries visible to other processes."""
+        if self.conn:
+            try:
+                self.conn.commit()
+            except sqlite3.Error as e:
+                self.failed(e)
+
+
+    def evict(self, max_entries: int=MAX_ENTRIES, max_age_days: float=MAX_AGE_DAYS):
+        """Drop stale entries, then oldest beyond max_entries."""
+        cutoff = time.time() - max_age_days * 86400
+        for table in ("metadata", "hashes"):
+            self.conn.execute(f"DELETE FROM {table} WHERE accessed < ?", (cutoff,))
+            self.conn.execute(f"""
+                DELETE FROM {table} WHERE path IN (
+                    SELECT path FROM {table} ORDER BY accessed DESC
+                    LIMIT -1 OFFSET ?)""", (max_entries,))
+
+
+    def close(self):
+        if self.conn:
+            try:
+                self.evict()
+                self.conn.commit()
+                self.conn.close()
+            except sqlite3.Error as e:
+                self.failed(e)
+            self.conn = None
@@ -0,0 +1,45 @@
+import os
+import mmap
+import hashlib
+
+# xxh3 when the xxhash package is installed, blake2b from the standard
+# library otherwise. HASH_NAME is stored with cached digests so they
+# are never compared across algorithms.
+try:
+    import xxhash
+    HASH_NAME = "xxh3_128"
+    new_hash = xxhash.xxh3_128
+except ImportError:
+    HASH_NAME = "blake2b"
+
+    def new_hash():
+        return hashlib.blake2b(digest_size=16)
+
+# Mapped files are hashed in CHUNK_BYTES slices, large updates let the
+# hash run without the GIL so several files hash at once.
+CHUNK_BYTES = 8 * 1024 ** 2
+
+
+def hash_file(path: str) -> str:
+    """Hex digest of a file's content, read through mmap."""
+    digest = new_hash()
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, size, CHUNK_BYTES):
+                        digest.update(view[offset:offset + CHUNK_BYTES])
+                finally:
+                    view.release()
+    return digest.hexdigest()
+
+
+def hash_set(tiles: list) -> str:
+    """Fingerprint of a texture set from (udim, tile digest)
+    pairs, equal for sets with byte identical tiles."""
+    digest = new_hash()
+    for udim, tile_digest in sorted(tiles):
+        digest.update(f"{udim}:{tile_digest};".encode())
+    return digest.hexdigest()
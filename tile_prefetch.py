@@ -0,0 +1,142 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+PREFETCH_WORKERS = 4
+PREFETCH_BUDGET_BYTES = 2 * 1024 ** 3
+READ_CHUNK_BYTES = 1024 ** 2
+
+
+class TilePrefetcher:
+    """Warm the page cache for upcoming texture sets on a thread
+    pool while Mari imports the current one. At most budget_bytes
+    of tiles are held ahead of the set being imported."""
+    def __init__(self, workers: int=PREFETCH_WORKERS,
+                 budget_bytes: int=PREFETCH_BUDGET_BYTES, use_fadvise: bool=False):
+        self.budget_bytes = budget_bytes
+        self.use_fadvise = use_fadvise and hasattr(os, "posix_fadvise")
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.condition = threading.Condition()
+        self.in_flight = 0
+        self.stopped = False
+        self.sets = {}
+        self.hits = 0
+        self.partial = 0
+        self.misses = 0
+        self.bytes_read = 0
+
+
+    def submit(self, key, paths: list):
+        """Queue a set for prefetch, sets are read in submit order."""
+        state = {"paths": paths, "done": 0, "bytes": 0, "released": False}
+        self.sets[key] = state
+        for path in paths:
+            self.executor.submit(self.prefetch_file, state, path)
+
+
+    def acquire(self, size: int) -> bool:
+        """Block until size fits in the budget, a file bigger
+        than the budget may go once nothing else is held."""
+        with self.condition:
+            while not self.stopped and self.in_flight \
+                    and self.in_flight + size > self.budget_bytes:
+                self.condition.wait()
+            if self.stopped:
+                return False
+            self.in_flight += size
+            return True
+
+
+    def release(self, size: int):
+        with self.condition:
+            self.in_flight -= size
+            self.condition.notify_all()
+
+
+    def prefetch_file(self, state: dict, path: str):
+        if self.stopped or state["released"]:
+            return
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        if not self.acquire(size):
+            return
+        if state["released"]:
+            self.release(size)
+            return
+        try:
+            self.read_file(path)
+        except OSError:
+            self.release(size)
+            return
+
+        with self.condition:
+            if state["released"]:
+                # Set was imported while we read, nothing to hold.
+                self.in_flight -= size
+                self.condition.notify_all()
+            else:
+                state["bytes"] += size
+            state["done"] += 1
+            self.bytes_read += size
+
+
+    def read_file(self, path: str):
+        """Pull file into the page cache."""
+        with open(path, "rb", buffering=0) as f:
+            if self.use_fadvise:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+                return
+            buffer = bytearray(READ_CHUNK_BYTES)
+            while f.readinto(buffer):
+                if self.stopped:
+                    return
+
+
+    def start_import(self, key) -> str:
+        """Record whether a set was warm when Mari reached it,
+        returns 'hit', 'partial' or 'miss'."""
+        state = self.sets.get(key)
+        with self.condition:
+            done = state["done"] if state else 0
+            total = len(state["paths"]) if state else 0
+        if total and done == total:
+            self.hits += 1
+            return "hit"
+        elif done:
+            self.partial += 1
+            return "partial"
+        self.misses += 1
+        return "miss"
+
+
+    def finish_import(self, key):
+        """Set has been imported, free its share of the budget."""
+        state = self.sets.get(key)
+        if not state:
+            return
+        with self.condition:
+            state["released"] = True
+            self.in_flight -= state["bytes"]
+            state["bytes"] = 0
+            self.condition.notify_all()
+
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.partial + self.misses
+        return self.hits / total if total else 0.0
+
+
+    def summary(self) -> str:
+        return (f"{self.hits} hit, {self.partial} partial, {self.misses} miss "
+                f"({self.hit_rate():.0%} hit rate), "
+                f"{self.bytes_read / 1024 ** 2:.0f}MB prefetched")
+
+
+    def close(self):
+        """Stop reading, queued files are dropped."""
+        with self.condition:
+            self.stopped = True
+            self.condition.notify_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+import os
+import queue
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Folders listed at once. Each listing is a readdir round trip, on
+# NFS/SMB that is mostly waiting, so threads overlap the latency. At
+# most CRAWL_AHEAD listings per worker are queued or held ahead of the
+# consumer, so a slow consumer or an early stop doesn't list the tree.
+CRAWL_WORKERS = 16
+CRAWL_AHEAD = 4
+
+
+class TreeCrawler:
+    """Lists folder trees with sibling folders expanded in
+    parallel. Yields (dirpath, file names) per folder."""
+    def __init__(self, workers: int=CRAWL_WORKERS, ordered: bool=True,
+                 on_error=None, ahead: int=CRAWL_AHEAD):
+        self.workers = workers
+        self.ordered = ordered
+        self.on_error = on_error
+        self.max_ahead = max(workers * ahead, 1)
+
+
+    def crawl(self, roots):
+        """Walk one root or a list in turn. ordered gives a
+        depth first walk with names sorted, the same every run,
+        otherwise folders come as soon as they are listed."""
+        roots = [roots] if isinstance(roots, str) else roots
+        self.executor = ThreadPoolExecutor(self.workers, thread_name_prefix="crawl")
+        try:
+            for root in roots:
+                if self.ordered:
+                    yield from self.crawl_ordered(root)
+                else:
+                    yield from self.crawl_unordered(root)
+        finally:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+    def submit(self, dirpath: str, done=None):
+        """List dirpath on the pool, in the caller's context so
+        anything it logs goes where the caller's does."""
+        future = self.executor.submit(contextvars.copy_context().run,
+                                      self.list_dir, dirpath)
+        if done:
+            future.add_done_callback(done)
+        return future
+
+
+    def list_dir(self, dirpath: str) -> tuple:
+        """Returns (dirpath, files, child folders)."""
+        files = []
+        dirs = []
+        try:
+            with os.scandir(dirpath) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry.name)
+                    elif not entry.is_symlink():
+                        dirs.append(entry.path)
+        except OSError as e:
+            if self.on_error:
+                self.on_error(dirpath, e)
+        if self.ordered:
+            files.sort()
+            dirs.sort()
+        return dirpath, files, dirs
+
+
+    def crawl_ordered(self, root: str):
+        # Stack of [dirpath, future or None], the top is listed next.
+        # Folders nearest the top are submitted ahead of time.
+        stack = [[root, None]]
+        ahead = 0
+        while stack:
+            for entry in reversed(stack):
+                if entry[1] is None:
+                    # The top is needed now, whatever is already ahead.
+                    if ahead >= self.max_ahead and entry is not stack[-1]:
+                        break
+                    entry[1] = self.submit(entry[0])
+                    ahead += 1
+                elif ahead >= self.max_ahead:
+                    break
+            _, future = stack.pop()
+            ahead -= 1
+            dirpath, files, dirs = future.result()
+            yield dirpath, files
+            stack.extend([child, None] for child in reversed(dirs))
+
+
+    def crawl_unordered(self, root: str):
+        done = queue.SimpleQueue()
+        pending = deque([root])
+        ahead = 0
+        while pending or ahead:
+            while pending and ahead < self.max_ahead:
+                self.submit(pending.popleft(), done.put)
+                ahead += 1
+            dirpath, files, dirs = done.get().result()
+            ahead -= 1
+            yield dirpath, files
+            pending.extend(dirs)
+
+
+def crawl(roots, workers: int=CRAWL_WORKERS, ordered: bool=True, on_error=None):
+    """Yield (dirpath, file names) for each folder below roots,
+    see TreeCrawler. on_error(dirpath, error) is called for
+    folders that can't be listed, they are skipped."""
+    yield from TreeCrawler(workers, ordered, on_error).crawl(roots)
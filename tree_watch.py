@@ -0,0 +1,227 @@
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+
+# inotify constants from <sys/inotify.h>.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+# Polling fallback interval, every poll is a stat of the whole tree.
+POLL_SECONDS = 2.0
+
+# Exporters write tiles in bursts, changes are held until nothing has
+# happened for DEBOUNCE_SECONDS, or MAX_DELAY_SECONDS have passed.
+DEBOUNCE_SECONDS = 1.0
+MAX_DELAY_SECONDS = 10.0
+
+
+class InotifyWatcher:
+    """Watch folder trees with Linux inotify. Files are
+    reported once closed after writing, moved or deleted."""
+    kind = "inotify"
+
+    def __init__(self, roots: list):
+        self.roots = [roots] if isinstance(roots, str) else roots
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.dirs = {}
+        try:
+            for root in self.roots:
+                self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def add_watch(self, dirpath: str):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), dirpath)
+        self.dirs[wd] = dirpath
+
+
+    def add_tree(self, path: str) -> list:
+        """Watch path and every folder below it, returns the
+        files already inside so a moved in folder is picked up."""
+        files = []
+        stack = [path]
+        while stack:
+            dirpath = stack.pop()
+            self.add_watch(dirpath)
+            try:
+                with os.scandir(dirpath) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            files.append(entry.path)
+            except OSError:
+                continue
+        return files
+
+
+    def poll(self, timeout: float=None) -> set:
+        """Paths changed within timeout seconds, None if the
+        kernel queue overflowed and events were lost."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        changed = set()
+        overflow = False
+        while not changed and not overflow:
+            wait = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([self.fd], [], [], wait)
+            if not ready:
+                break
+            self.read_events(changed)
+            overflow = None in changed
+            changed.discard(None)
+        return None if overflow else changed
+
+
+    def read_events(self, changed: set):
+        """Drain the inotify fd into changed, None is added
+        if the kernel queue overflowed."""
+        while True:
+            try:
+                data = os.read(self.fd, 65536)
+            except OSError as e:
+                if e.errno == errno.EAGAIN:
+                    break
+                raise
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    changed.add(None)
+                    continue
+                if mask & IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                dirpath = self.dirs.get(wd)
+                if dirpath is None or not name:
+                    continue
+                path = os.path.join(dirpath, os.fsdecode(name))
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.update(self.add_tree(path))
+                    except OSError:
+                        # Gone already or out of watches, rescan.
+                        changed.add(None)
+                elif mask & IN_ISDIR or not mask & IN_CREATE:
+                    # Created files are reported when closed.
+                    changed.add(path)
+
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Fallback for systems or mounts without inotify, diffs
+    a (mtime, size) snapshot of the trees every interval."""
+    kind = "polling"
+
+    def __init__(self, roots: list, interval: float=POLL_SECONDS):
+        self.roots = [roots] if isinstance(roots, str) else roots
+        self.interval = interval
+        self.files = self.snapshot()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *args):
+        pass
+
+
+    def snapshot(self) -> dict:
+        files = {}
+        stack = list(self.roots)
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            stat = entry.stat(follow_symlinks=False)
+                            files[entry.path] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                continue
+        return files
+
+
+    def poll(self, timeout: float=None) -> set:
+        """Paths changed since the last poll. Waits at least one
+        interval, longer if nothing changed and timeout allows."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            files = self.snapshot()
+            changed = {p for p in files.keys() | self.files.keys()
+                       if files.get(p) != self.files.get(p)}
+            self.files = files
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+
+def make_watcher(roots: list):
+    """inotify watcher if available, polling otherwise.
+    Returns (watcher, reason inotify was not used)."""
+    try:
+        return InotifyWatcher(roots), None
+    except (OSError, AttributeError) as e:
+        return PollingWatcher(roots), str(e)
+
+
+def wait_for_changes(watcher, timeout: float=None,
+                     debounce: float=DEBOUNCE_SECONDS,
+                     max_delay: float=MAX_DELAY_SECONDS) -> set:
+    """Block up to timeout for changes, then keep collecting
+    until quiet for debounce seconds. Returns changed paths,
+    an empty set on timeout, or None if events were lost."""
+    changed = watcher.poll(timeout)
+    if not changed:
+        return changed
+
+    deadline = time.monotonic() + max_delay
+    while time.monotonic() < deadline:
+        more = watcher.poll(debounce)
+        if more is None:
+            return None
+        if not more:
+            break
+        changed |= more
+    return changed